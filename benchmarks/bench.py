@@ -0,0 +1,145 @@
+"""Headless benchmarks for every mode's generate / apply / render / export path.
+
+    python benchmarks/bench.py run [--modes M ...] [--out results.json] [--quick]
+    python benchmarks/bench.py compare baseline.json results.json [--threshold 0.10]
+
+`run` writes one JSON file of per-mode metrics; `compare` prints the change of
+each metric against a baseline and exits 1 when any moved the wrong way by
+more than the threshold. Generation uses a fixed seed, so the resample counts are
+exactly comparable between runs; the timings are the best of a few repeats.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from scrambler import notation
+from scrambler.clock import clock_values
+from scrambler.engine import get_engine
+from scrambler.generate import generate_batch, load_tables
+from scrambler.modes import MODES, is_clock
+
+SEED = 20240601
+
+# metric -> True if bigger is better
+METRICS = {
+    "scrambles_per_sec": True,
+    "moves_per_sec": True,
+    "resamples_per_scramble": False,
+    "render_ms_per_diagram": False,
+    "export_sec_per_round": False,
+}
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def move_count(scramble):
+    return sum(1 for tok in scramble.split() if tok.lower() != "y2")
+
+
+def bench_mode(mode, n, diagrams, rounds, repeat):
+    from scrambler import export, vector
+
+    stats = {}
+    scrambles = generate_batch(mode, n, seed=SEED, stats=stats)
+    gen = best_of(repeat, lambda: generate_batch(mode, n))
+
+    # Parsing is cached per scramble string; start each pass cold so the rate is the same whatever n is.
+    if is_clock(mode):
+        def apply_all():
+            notation.clock_coefficients.cache_clear()
+            [clock_values(scr, mode) for scr in scrambles]
+    else:
+        engine = get_engine(mode)
+        def apply_all():
+            notation.compiled.cache_clear()
+            [engine.apply(scr) for scr in scrambles]
+    apply = best_of(repeat, apply_all)
+
+    w, h = export.diagram_size(mode)
+    sample = scrambles[:diagrams]
+    render = best_of(repeat, lambda: [vector.to_pdf_ops(*vector.scramble_shapes(mode, scr), w, h) for scr in sample])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        packet = best_of(max(1, repeat // 2), lambda: export.export_pdf(path, "Benchmark", "2024-06-01", mode, rounds, workers=1))
+
+    return {
+        "scrambles_per_sec": n / gen,
+        "moves_per_sec": sum(map(move_count, scrambles)) / apply,
+        "resamples_per_scramble": stats.get("resampled", 0) / n,
+        "render_ms_per_diagram": 1000 * render / len(sample),
+        "export_sec_per_round": packet / rounds,
+    }
+
+
+def run(args):
+    load_tables()
+    n, diagrams, rounds, repeat = (500, 10, 1, 2) if args.quick else (5000, 50, 4, 5)
+    results = {}
+    for mode in args.modes:
+        results[mode] = bench_mode(mode, n, diagrams, rounds, repeat)
+        print(f"{mode:<18}" + "  ".join(f"{k}={v:.4g}" for k, v in results[mode].items()), flush=True)
+    doc = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": {"scrambles": n, "diagrams": diagrams, "rounds": rounds, "repeat": repeat},
+        "results": results,
+    }
+    with open(args.out, "w") as f: json.dump(doc, f, indent=2)
+    print(f"wrote {args.out}")
+
+
+def compare(args):
+    with open(args.baseline) as f: base = json.load(f)["results"]
+    with open(args.current) as f: cur = json.load(f)["results"]
+    regressions = 0
+    print(f"{'mode':<18} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>8}")
+    for mode in [m for m in cur if m in base]:
+        for metric, higher_better in METRICS.items():
+            old, new = base[mode].get(metric), cur[mode].get(metric)
+            if old is None or new is None: continue
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_better else change
+            flag = ""
+            if worse > args.threshold: flag, regressions = "  REGRESSION", regressions + 1
+            print(f"{mode:<18} {metric:<22} {old:>12.4g} {new:>12.4g} {change:>+8.1%}{flag}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="benchmark the modes and write a JSON results file")
+    p.add_argument("--modes", nargs="+", default=MODES, choices=MODES, metavar="MODE")
+    p.add_argument("--out", default="bench-results.json")
+    p.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke test")
+    p = sub.add_parser("compare", help="compare a results file against a baseline")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
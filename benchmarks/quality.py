@@ -0,0 +1,241 @@
+"""Statistical quality of every mode's scrambles, from millions of headless samples.
+
+    python benchmarks/quality.py [--modes M ...] [-n 1000000] [--strings 50000] [--length MIN[-MAX]] [--workers N] [--out quality.json]
+
+Final states are binned and compared with what uniformly random states give:
+
+- position: the colour on each sticker, or the value on each dial. For a mode
+  without a distance table the expectation comes from the orbits of the move
+  group (a uniform state puts every sticker of an orbit on each of its
+  positions equally often), so it needs no enumeration.
+- state: the whole state, for modes with a distance table, against uniform
+  over the states the generator may produce (unsolved, and at least the
+  random-state minimum distance where there is one).
+- distance: moves from solved, for the same modes, against the table's histogram.
+- amount: for clocks, each written move amount mod 12 against uniform.
+
+Each line gives chi-square per degree of freedom (about 1 for a fair
+generator) and its z-score, and the total-variation distance next to the TV
+that the same number of perfectly uniform samples would show anyway; for
+`position` they are the worst single position. `--length` overrides the
+random-move length range and makes random-state modes use random moves too,
+so the shortest fair length can be read off a few runs.
+
+The main samples are drawn the way `generate_batch` draws them, without
+writing them out. The same checks (suffixed `/strings`) then run on fewer
+samples (`--strings`, 50000 by default) made by generating the actual
+scramble strings and applying them, so the formatting and parsing in between
+are covered too. They test the shipped lengths, so `--length` skips them.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from scrambler.clock import get_clock_engine
+from scrambler.engine import get_engine
+from scrambler.generate import (RANDOM_STATE_MIN_DISTANCE, clock_template, distance_table, generate_batch, move_spec, sample_batch,
+                                sample_clock_amounts)
+from scrambler.modes import MODES, is_clock
+from scrambler.seeding import event_key
+from scrambler.state import state_arrays
+
+CHUNK = 100_000
+STRING_SAMPLES = 50_000
+# Sticker modes small enough to tabulate; 3x3x2 is far too big.
+TABLE_MODES = list(RANDOM_STATE_MIN_DISTANCE) + ["2x2x3 Cuboid"]
+
+
+def min_distance(mode, lengths):
+    # Random-move scrambles are only redrawn when they come out solved.
+    return RANDOM_STATE_MIN_DISTANCE.get(mode, 1) if lengths is None else 1
+
+
+def string_states(mode, n, rng):
+    """(n, stickers or dials) final states of n scramble strings from `generate_batch`, plus the clock amounts they write."""
+    scrambles = generate_batch(mode, n, seed=rng)
+    states = state_arrays(mode, scrambles).astype(np.int64)
+    if not is_clock(mode): return states, None
+    engine = get_clock_engine(mode)
+    front, back = clock_template(mode)
+    columns = [engine.column(m) for m in front] + [engine.column(m, True) for m in back]
+    return states - 1, np.stack([engine.coefficients(scr) for scr in scrambles])[:, columns]
+
+
+def sample_states(mode, n, rng, lengths=None, strings=False):
+    """(n, stickers or dials) final states, drawn the way `generate_batch` draws them, plus clock amounts.
+
+    Random-state modes are drawn from their tables directly: their scramble
+    strings are optimal solutions, so they reach exactly the drawn states.
+    With `strings`, the states come from applying `generate_batch`'s output instead.
+    """
+    if strings: return string_states(mode, n, rng)
+    if is_clock(mode):
+        engine = get_clock_engine(mode)
+        amounts = np.hstack(sample_clock_amounts(mode, n, rng))
+        return engine.apply(amounts, engine.template_matrix(*clock_template(mode))) - 1, amounts
+    if mode in RANDOM_STATE_MIN_DISTANCE and lengths is None:
+        return distance_table(mode).sample_states(n, rng, RANDOM_STATE_MIN_DISTANCE[mode]), None
+    return sample_batch(mode, n, rng, lengths=lengths)[1], None
+
+
+def _symbols(mode):
+    return 12 if is_clock(mode) else int(get_engine(mode).solved.max()) + 1
+
+
+def _position_counts(states, symbols):
+    offsets = np.arange(states.shape[1]) * symbols
+    return np.bincount((states + offsets).ravel(), minlength=states.shape[1] * symbols).reshape(-1, symbols)
+
+
+def sample_counts(mode, n, seed, lengths=None, strings=False):
+    """Histograms of n samples, to be summed across chunks."""
+    states, amounts = sample_states(mode, n, np.random.default_rng(seed), lengths, strings)
+    counts = {"position": _position_counts(states, _symbols(mode))}
+    if amounts is not None: counts["amount"] = np.bincount((amounts % 12).ravel(), minlength=12)[None]
+    if mode in TABLE_MODES:
+        table = distance_table(mode)
+        rows = table.index(states)
+        counts["state"] = np.bincount(rows, minlength=len(table))[None]
+        counts["distance"] = np.bincount(table.dist[rows], minlength=int(table.dist.max()) + 1)[None]
+    return counts
+
+
+def _orbit_expectation(mode):
+    engine = get_engine(mode)
+    parent = list(range(len(engine.solved)))
+    def root(p):
+        while parent[p] != p: p = parent[p]
+        return p
+    for m in move_spec(mode)[0]:
+        for a, b in enumerate(engine.table[m].tolist()): parent[root(a)] = root(b)
+    roots = np.array([root(p) for p in range(len(parent))])
+    symbols = _symbols(mode)
+    expected = np.zeros((len(parent), symbols))
+    for r in np.unique(roots):
+        orbit = roots == r
+        expected[orbit] = np.bincount(engine.solved[orbit], minlength=symbols) / orbit.sum()
+    return expected
+
+
+def expected(mode, lengths):
+    """Probabilities matching each histogram of `sample_counts`, for uniformly random states."""
+    if is_clock(mode):
+        # Every dial row of the move matrix has a +-1 entry, so a uniform state has uniform dials.
+        dials = get_clock_engine(mode).matrix.shape[0]
+        return {"position": np.full((dials, 12), 1 / 12), "amount": np.full((1, 12), 1 / 12)}
+    if mode not in TABLE_MODES: return {"position": _orbit_expectation(mode)}
+    table = distance_table(mode)
+    eligible = np.flatnonzero(table.dist >= min_distance(mode, lengths))
+    state = np.zeros(len(table))
+    state[eligible] = 1 / len(eligible)
+    return {
+        "position": _position_counts(table.states(eligible), _symbols(mode)) / len(eligible),
+        "state": state[None],
+        "distance": (np.bincount(table.dist[eligible], minlength=int(table.dist.max()) + 1) / len(eligible))[None],
+    }
+
+
+def compare(observed, probs):
+    """Chi-square and TV of count rows against probability rows, summed (chi-square) or worst row (TV)."""
+    n = observed.sum(axis=1, keepdims=True)
+    live = probs > 0
+    exp = n * probs
+    chi2 = float(np.where(live, (observed - exp) ** 2 / np.where(live, exp, 1), 0).sum())
+    dof = int((live.sum(axis=1) - 1).sum())
+    tv = 0.5 * np.abs(observed / n - probs).sum(axis=1)
+    noise = 0.5 * np.sqrt(2 * probs * (1 - probs) / (math.pi * n)).sum(axis=1)
+    worst = int(np.argmax(tv - noise))
+    return {
+        "chi2_per_dof": chi2 / dof if dof else 0.0,
+        "z": (chi2 - dof) / math.sqrt(2 * dof) if dof else 0.0,
+        "tv": float(tv[worst]),
+        "tv_noise": float(noise[worst]),
+        "row": worst,
+        "impossible": int(observed[~live].sum()),
+    }
+
+
+def _chunked(processes, mode, n, seed_seq, lengths=None, strings=False):
+    chunks = [min(CHUNK, n - i) for i in range(0, n, CHUNK)]
+    totals = {}
+    for future in [processes.submit(sample_counts, mode, size, s, lengths, strings) for size, s in zip(chunks, seed_seq.spawn(len(chunks)))]:
+        for name, counts in future.result().items(): totals[name] = totals.get(name, 0) + counts
+    return totals
+
+
+def run(modes, n, workers, seed, lengths, strings=0):
+    for mode in modes:
+        if mode in TABLE_MODES: distance_table(mode)  # build before the workers all try to
+    results = {}
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as processes:
+        for mode in modes:
+            start = time.perf_counter()
+            totals = _chunked(processes, mode, n, np.random.SeedSequence(seed, spawn_key=(event_key(mode),)), lengths)
+            probs = expected(mode, lengths)
+            checks = {name: compare(totals[name], probs[name]) for name in totals}
+            if strings:
+                totals_s = _chunked(processes, mode, strings, np.random.SeedSequence(seed, spawn_key=(event_key(mode), 1)), strings=True)
+                checks.update({f"{name}/strings": compare(totals_s[name], probs[name]) for name in totals_s})
+            random_moves = not is_clock(mode) and (lengths is not None or mode not in RANDOM_STATE_MIN_DISTANCE)
+            results[mode] = {
+                "samples": n,
+                "lengths": list(lengths or move_spec(mode)[1]) if random_moves else None,
+                "seconds": time.perf_counter() - start,
+                "strings": strings,
+                "checks": checks,
+            }
+            if "distance" in totals:
+                results[mode]["distance"] = {"observed": (totals["distance"][0] / n).tolist(), "expected": probs["distance"][0].tolist()}
+            report(mode, results[mode])
+    return results
+
+
+def report(mode, result):
+    lengths = "" if result["lengths"] is None else f"  lengths {result['lengths'][0]}-{result['lengths'][1]}"
+    strings = f" (+{result['strings']} from strings)" if result["strings"] else ""
+    print(f"{mode}: {result['samples']} samples{strings} in {result['seconds']:.1f}s{lengths}")
+    for name, c in result["checks"].items():
+        flag = f"  {c['impossible']} IMPOSSIBLE" if c["impossible"] else ""
+        print(f"  {name:<17} chi2/dof {c['chi2_per_dof']:>8.3f}  z {c['z']:>+8.1f}  TV {c['tv']:.4f} (noise {c['tv_noise']:.4f}){flag}")
+    if "distance" in result:
+        obs, exp = result["distance"]["observed"], result["distance"]["expected"]
+        print("  distance " + " ".join(f"{d}:{o:.3f}/{e:.3f}" for d, (o, e) in enumerate(zip(obs, exp)) if o or e))
+    sys.stdout.flush()
+
+
+def parse_lengths(text):
+    lo, _, hi = text.partition("-")
+    return int(lo), int(hi or lo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES, metavar="MODE")
+    parser.add_argument("-n", type=int, default=1_000_000, help="samples per mode (default 1000000)")
+    parser.add_argument("--strings", type=int, metavar="N",
+                        help=f"samples made by applying generated scramble strings (default {STRING_SAMPLES}; 0 to skip)")
+    parser.add_argument("--length", type=parse_lengths, metavar="MIN[-MAX]", help="random-move length range to test instead of the shipped one")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=20240601)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+    if args.strings and args.length: parser.error("--strings checks the shipped lengths; it can't be combined with --length")
+    strings = 0 if args.length else STRING_SAMPLES if args.strings is None else args.strings
+    results = run(args.modes, args.n, args.workers, args.seed, args.length, strings)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(results, f, indent=2)
+        print(f"wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
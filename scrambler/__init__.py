@@ -0,0 +1 @@
+"""Headless puzzle geometry, rendering and scramble logic behind the Tk scrambler."""
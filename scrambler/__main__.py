@@ -0,0 +1,74 @@
+"""Print scrambles without the GUI: python -m scrambler MODE [-n COUNT] [--seed SEED].
+
+With --seed and --round, the scrambles are the ones that seed's packet has for
+that round (or just scramble --index of it), for audits and reprints.
+Only NumPy and the scramble core are imported; no display is needed.
+"""
+import argparse
+import os
+import sys
+
+from .modes import MODES, find_mode
+
+
+def _mode(name):
+    mode = find_mode(name)
+    if mode is not None: return mode
+    raise argparse.ArgumentTypeError(f"unknown mode {name!r} (see --list)")
+
+
+def _at_least(minimum):
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            value = None
+        if value is None or value < minimum:
+            raise argparse.ArgumentTypeError(f"expected a whole number of at least {minimum}, not {text!r}")
+        return value
+    return parse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scrambler", description="Print scrambles, one per line.")
+    parser.add_argument("mode", nargs="?", type=_mode, help="puzzle mode, e.g. 'Pentagonal' or '2x2x3 Cuboid'")
+    parser.add_argument("-n", "--count", type=_at_least(1), default=1, help="number of scrambles (default 1)")
+    parser.add_argument("--seed", type=_at_least(0), help="seed for a reproducible batch")
+    parser.add_argument("--round", type=_at_least(1), help="with --seed: print that round of the seeded packet (-n scrambles)")
+    parser.add_argument("--index", type=_at_least(1), help="with --round: only scramble INDEX (1-based, extras after the regular ones)")
+    parser.add_argument("--svg", metavar="DIR", help="also write a diagram of each scramble to DIR")
+    parser.add_argument("--trace", metavar="PATH", nargs="?", const="scrambler-trace.json",
+                        help="record stage timings to a Chrome trace (same as SCRAMBLER_TRACE=PATH)")
+    parser.add_argument("--list", action="store_true", help="list the modes and exit")
+    args = parser.parse_args(argv)
+    if args.list:
+        print("\n".join(MODES)); return 0
+    if args.mode is None: parser.error("a mode is required")
+    if args.round is not None and args.seed is None: parser.error("--round needs --seed")
+    if args.index is not None and args.round is None: parser.error("--index needs --round")
+    if args.trace:
+        from . import trace
+        trace.enable(args.trace)
+
+    if args.index is not None:
+        from .seeding import seeded_scramble
+        scrambles = [seeded_scramble(args.seed, args.mode, args.round, args.index)]
+    elif args.round is not None:
+        from .seeding import seeded_round
+        scrambles = seeded_round(args.seed, args.mode, args.round, args.count)
+    else:
+        from .generate import generate_batch
+        scrambles = generate_batch(args.mode, args.count, seed=args.seed)
+    sys.stdout.write("".join(f"{scr}\n" for scr in scrambles))
+    if args.svg:
+        from .vector import scramble_shapes, to_svg
+        os.makedirs(args.svg, exist_ok=True)
+        slug = args.mode.lower().replace(" ", "-")
+        for i, scr in enumerate(scrambles, start=1):
+            with open(os.path.join(args.svg, f"{slug}-{i}.svg"), "w") as f: f.write(to_svg(*scramble_shapes(args.mode, scr)))
+    if args.trace: trace.finish(args.trace)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
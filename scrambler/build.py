@@ -0,0 +1,228 @@
+"""Build a competition's packets from a manifest: python -m scrambler.build MANIFEST [--out DIR].
+
+A manifest (TOML or JSON) names the competition and lists its events:
+
+    name = "Odd Clock Open 2026"
+    date = "2026-10-18"
+    seed = "12480215376891540307"  # required: here, or on every event
+
+    [[events]]
+    mode = "Pentagonal"
+    rounds = 3
+
+    [[events]]
+    mode = "Ivy Cube"
+    rounds = 2
+    extras = 1        # scrambles = 5 and extras = 2 by default; seed overrides the competition's
+    file = "ivy.pdf"  # default: the mode's name; an event repeating a mode needs its own
+
+Each event becomes one PDF. Every round is content-addressed: its key hashes
+the event's mode, the round number, scramble counts and seed together with a
+fingerprint of how the mode is scrambled and drawn (move set or template,
+the puzzle model, and the artwork). A round's scrambles and rendered
+diagrams are cached under that key, so a rebuild only generates and renders
+the rounds whose inputs changed, and only rewrites the packets whose pages
+changed. A new competition name relays out the pages from cache. Because
+rounds come from the seed's substreams, a cached round is exactly what
+regenerating it would give, and matches `export_pdf` and `python -m scrambler
+--seed --round` for the same seed.
+
+Written packets claim their states in the duplicate index (`--no-dedup` to
+skip); states another packet already holds are reported but kept, as in any
+seeded export.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .clock import get_clock_engine
+from .engine import get_engine
+from .modes import find_mode, is_clock
+from .paths import cache_dir
+from .pool import spec_key
+
+BUILD_VERSION = 1
+STATE_FILE = ".build.json"
+
+
+def load_manifest(path):
+    """The manifest at `path` with defaults filled in; raises ValueError on anything missing or malformed."""
+    with open(path, "rb") as f:
+        if path.endswith(".toml"):
+            import tomllib
+            data = tomllib.load(f)
+        else:
+            data = json.load(f)
+    from .export import EXTRAS, SCRAMBLES
+    if not isinstance(data, dict): raise ValueError(f"{path}: expected a table at the top level")
+    for key in ("name", "date", "events"):
+        if key not in data: raise ValueError(f"{path}: missing {key!r}")
+    if not isinstance(data["events"], list): raise ValueError(f"{path}: 'events' must be a list of tables")
+    events, seen, files = [], set(), {}
+    for i, entry in enumerate(data["events"], start=1):
+        where = f"{path}: event {i}"
+        if not isinstance(entry, dict): raise ValueError(f"{where}: expected a table, not {entry!r}")
+        mode = find_mode(str(entry.get("mode", "")))
+        if mode is None: raise ValueError(f"{where}: unknown mode {entry.get('mode')!r}")
+        event = {"mode": mode, "rounds": entry.get("rounds"), "scrambles": entry.get("scrambles", SCRAMBLES),
+                 "extras": entry.get("extras", EXTRAS), "seed": entry.get("seed", data.get("seed"))}
+        # TOML integers stop at 2**63 - 1, and a 64-bit seed may not fit, so a string of digits is accepted too.
+        if isinstance(event["seed"], str) and event["seed"].isdigit(): event["seed"] = int(event["seed"])
+        # Rounds are only cacheable, and packets only reproducible, because they come from a seed.
+        if event["seed"] is None: raise ValueError(f"{where}: missing 'seed' (give the competition or the event one)")
+        for key in ("rounds", "scrambles", "extras", "seed"):
+            if not isinstance(event[key], int) or isinstance(event[key], bool) or event[key] < (1 if key in ("rounds", "scrambles") else 0):
+                raise ValueError(f"{where}: {key} must be a {'positive' if key in ('rounds', 'scrambles') else 'non-negative'} integer, not {event[key]!r}")
+        # Scrambles are keyed by mode within a seed, so a repeated pair would print the same scrambles twice.
+        if (mode, event["seed"]) in seen: raise ValueError(f"{where}: {mode} appears twice with the same seed")
+        seen.add((mode, event["seed"]))
+        event["file"] = str(entry.get("file", mode.lower().replace(" ", "-") + ".pdf"))
+        if event["file"] in files: raise ValueError(f"{where}: writes {event['file']!r} like event {files[event['file']]}; give one a 'file'")
+        files[event["file"]] = i
+        events.append(event)
+    return {"name": str(data["name"]), "date": str(data["date"]), "events": events}
+
+
+def _hash(*parts):
+    return hashlib.blake2b(json.dumps(parts).encode(), digest_size=16).hexdigest()
+
+
+def definition_key(mode):
+    """Fingerprint of how `mode` is scrambled and drawn: generator spec, puzzle model and diagram geometry."""
+    from . import export, vector
+    from .state import PuzzleState
+    h = hashlib.blake2b(spec_key(mode).encode(), digest_size=16)
+    if is_clock(mode):
+        h.update(get_clock_engine(mode).matrix.tobytes())
+    else:
+        engine = get_engine(mode)
+        h.update(engine.solved.tobytes())
+        for move in sorted(engine.table): h.update(move.encode() + engine.table[move].tobytes())
+    h.update(repr(export.artwork(mode)).encode())
+    shapes = vector.state_layer(mode, **vector.state_kwargs(PuzzleState.solved(mode)))
+    h.update(vector.to_pdf_ops(shapes, *vector.puzzle_size(mode), *export.diagram_size(mode)).encode())
+    return h.hexdigest()
+
+
+def round_key(event, r_num, definition):
+    return _hash(BUILD_VERSION, definition, event["mode"], r_num, event["seed"], event["scrambles"], event["extras"])
+
+
+def _cache_path(key):
+    return os.path.join(cache_dir("build"), f"{key}.json")
+
+
+def load_round(key):
+    try:
+        with open(_cache_path(key)) as f: return [tuple(row) for row in json.load(f)["rows"]]
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def save_round(key, mode, r_num, rows):
+    path = _cache_path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f: json.dump({"mode": mode, "round": r_num, "rows": rows}, f)
+    os.replace(tmp, path)
+
+
+def render_seeded_round(mode, r_num, seed, count):
+    """[(scramble, pdf_ops)] for round `r_num`, scrambles 1..count of the seed's substreams."""
+    from .export import render_round
+    from .seeding import seeded_round
+    return render_round(mode, r_num, seeded_round(seed, mode, r_num, count))
+
+
+def build(manifest_path, out_dir=None, workers=None, force=False, log=print, dedup=None):
+    """Bring every packet of the manifest up to date; returns the paths of the packets written.
+
+    With a `dedup` index (see `scrambler.dedup`), each packet written claims its
+    final states under the same name a seeded `export_pdf` uses, and states
+    already issued to other packets are reported. They are kept: the seed fixes them.
+    """
+    from .dedup import applies as dedup_applies
+    from .export import claim_rows, packet_name, write_packet
+    started = time.time()
+    manifest = load_manifest(manifest_path)
+    out_dir = out_dir or os.path.join(os.path.dirname(os.path.abspath(manifest_path)), "packets")
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, STATE_FILE)
+    try:
+        with open(state_path) as f: state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+
+    definitions = {mode: definition_key(mode) for mode in {e["mode"] for e in manifest["events"]}}
+    plans, missing = [], []
+    for event in manifest["events"]:
+        keys = [round_key(event, r, definitions[event["mode"]]) for r in range(1, event["rounds"] + 1)]
+        rows = {r: None if force else load_round(k) for r, k in enumerate(keys, start=1)}
+        missing += [(event, r, k) for r, k in enumerate(keys, start=1) if rows[r] is None]
+        plans.append((event, keys, rows))
+
+    tasks = [(e["mode"], r, e["seed"], e["scrambles"] + e["extras"]) for e, r, _ in missing]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as processes:
+            rendered = list(processes.map(render_seeded_round, *zip(*tasks)))
+    else:
+        rendered = [render_seeded_round(*task) for task in tasks]
+    fresh = {}
+    for (event, r, key), rows in zip(missing, rendered):
+        save_round(key, event["mode"], r, rows)
+        fresh[key] = rows
+
+    written = []
+    for event, keys, rows in plans:
+        path = os.path.join(out_dir, event["file"])
+        rebuilt = sum(1 for k in keys if k in fresh)
+        packet_key = _hash(BUILD_VERSION, manifest["name"], manifest["date"], event["mode"], event["scrambles"], event["seed"], keys)
+        if not force and state.get(event["file"]) == packet_key and os.path.exists(path):
+            log(f"{event['mode']}: up to date ({path})"); continue
+        rounds = [(r, rows[r] or fresh[k]) for r, k in enumerate(keys, start=1)]
+        packet, clashes = packet_name(manifest["name"], event["mode"], event["seed"]), ""
+        if dedup is not None and dedup_applies(event["mode"]):
+            kept = sum(claim_rows(dedup, event["mode"], r, round_rows, packet).count(False) for r, round_rows in rounds)
+            if kept: clashes = f", {kept} scramble(s) already issued elsewhere (kept)"
+        try:
+            write_packet(path, manifest["name"], manifest["date"], event["mode"], rounds, event["seed"], event["scrambles"])
+        except BaseException:
+            if dedup is not None: dedup.release(packet, started)
+            raise
+        state[event["file"]] = packet_key
+        written.append(path)
+        log(f"{event['mode']}: {event['rounds']} rounds, {rebuilt} generated, {event['rounds'] - rebuilt} from cache{clashes} -> {path}")
+
+    tmp = f"{state_path}.tmp"
+    with open(tmp, "w") as f: json.dump(state, f, indent=1)
+    os.replace(tmp, state_path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scrambler.build", description=__doc__.splitlines()[0])
+    parser.add_argument("manifest", help="competition manifest (.toml or .json)")
+    parser.add_argument("--out", help="directory for the packets (default: packets/ next to the manifest)")
+    parser.add_argument("--workers", type=int, help="processes for generating and rendering (default: all CPUs)")
+    parser.add_argument("--force", action="store_true", help="ignore the caches and rebuild everything")
+    parser.add_argument("--no-dedup", action="store_true", help="don't record the packets' states in the duplicate index")
+    args = parser.parse_args(argv)
+    try:
+        dedup = None
+        if not args.no_dedup:
+            from .dedup import DuplicateIndex
+            dedup = DuplicateIndex()
+        build(args.manifest, args.out, args.workers, args.force, dedup=dedup)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
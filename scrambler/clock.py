@@ -0,0 +1,181 @@
+"""Clock dial state for the Triangular, Pentagonal and Super-Pentagonal puzzles.
+
+Every clock move is linear over Z/12, so each mode compiles once into an
+integer move-effect matrix M: one row per dial (front dials, then back
+dials), one column per move (front moves, then the moves made after y2).
+Front moves also turn the mirrored back dials the other way. A scramble is a
+coefficient vector c of summed amounts, its final state is M @ c mod 12, and
+N scrambles are one (N, moves) @ M.T product.
+
+`ClockSolver` inverts that map for a fixed move template. The Smith normal
+form U @ M @ V = D turns M c = s (mod 12) into independent one-dial equations
+d_i y_i = (U s)_i, which say exactly which states the template reaches and
+give move amounts for any of them. Drawing the reachable states uniformly
+is then a draw per diagonal entry and one matrix product.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from . import trace
+from .modes import clock_count
+
+
+def _move_definitions(mode):
+    if mode == "Triangular":
+        move_map = {"DR":[5,4,2], "DL":[3,4,1], "U":[0,1,2], "R":[0,1,2,4,5], "D":[1,2,3,4,5], "L":[0,1,2,3,4], "ALL":[0,1,2,3,4,5]}
+        mirror_indices = {0:0, 3:5, 5:3}
+        return move_map, mirror_indices
+    l2i = {1:0, 3:2, 5:4, 7:6, 9:8, 2:1, 4:3, 6:5, 8:7, 10:9}
+    if mode == "Super-Pentagonal": l2i[11] = 10
+    move_map_labels = {'UR': [2,6,7], 'DR': [3,7,8], 'DL': [4,8,9], 'UL': [5,9,10], 'UM': [10,6,1], 'L': [5,4,9,10,1], 'U': [2,10,1,5,6], 'R': [1,2,3,6,7], 'DRW': [3,4,2,8,7], 'DLW': [5,4,3,8,9], 'ALL': [1,2,3,4,5,6,7,8,9,10]}
+    if mode == "Super-Pentagonal":
+        move_map_labels['ALL'].append(11)
+        for k in ['UR', 'DR', 'DL', 'UL', 'UM']: move_map_labels[k].append(11)
+    move_map = {k: [l2i[lbl] for lbl in v] for k, v in move_map_labels.items()}
+    mirror_indices = {0:0, 1:4, 2:3, 3:2, 4:1}
+    return move_map, mirror_indices
+
+
+class ClockEngine:
+    def __init__(self, mode):
+        self.mode, self.dials = mode, clock_count(mode)
+        move_map, mirror_indices = _move_definitions(mode)
+        self.commands = list(move_map)
+        k, n = len(self.commands), self.dials
+        self.matrix = np.zeros((2 * n, 2 * k), dtype=np.int64)
+        for j, cmd in enumerate(self.commands):
+            for idx in move_map[cmd]:
+                if idx >= n: continue
+                self.matrix[idx, j] += 1
+                if idx in mirror_indices: self.matrix[n + mirror_indices[idx], j] -= 1
+                self.matrix[n + idx, k + j] += 1
+
+    def column(self, cmd, back=False):
+        try:
+            return self.commands.index(cmd.upper()) + (len(self.commands) if back else 0)
+        except ValueError:
+            raise ValueError(f"{self.mode}: unknown clock move {cmd!r}") from None
+
+    def coefficients(self, text):
+        """Parse a scramble into its coefficient vector (summed amount per move and side); see `notation`."""
+        from .notation import clock_coefficients
+        if trace.ENABLED: trace.count("moves_applied", sum(1 for tok in text.split() if tok.lower() != "y2"))
+        return clock_coefficients(self.mode, text)
+
+    def template_solver(self, front, back):
+        return ClockSolver(self.template_matrix(front, back))
+
+    def template_matrix(self, front, back):
+        """Columns of M for a fixed move template, so (N, len(front) + len(back)) amounts map straight to states."""
+        return self.matrix[:, [self.column(m) for m in front] + [self.column(m, True) for m in back]]
+
+    def apply(self, coeffs, matrix=None):
+        """Dial values (1..12) for one coefficient vector or an (N, moves) stack of them."""
+        matrix = self.matrix if matrix is None else matrix
+        return (np.asarray(coeffs) @ matrix.T - 1) % 12 + 1
+
+    def values(self, text):
+        state = self.apply(self.coefficients(text))
+        return state[:self.dials].tolist(), state[self.dials:].tolist()
+
+
+def smith_normal_form(a):
+    """(u, d, v, u_inv) with u @ a @ v == d diagonal and u, v unimodular, as integer lists of lists.
+
+    Python ints throughout: the multipliers in u and v can outgrow int64 long
+    before d does.
+    """
+    a = [list(map(int, row)) for row in a]
+    m, n = len(a), len(a[0])
+    u = [[int(i == j) for j in range(m)] for i in range(m)]
+    u_inv = [row[:] for row in u]
+    v = [[int(i == j) for j in range(n)] for i in range(n)]
+
+    # Row operations go into u and, inverted, into u_inv's columns; column operations into v.
+    def swap_rows(i, j):
+        a[i], a[j] = a[j], a[i]; u[i], u[j] = u[j], u[i]
+        for row in u_inv: row[i], row[j] = row[j], row[i]
+    def add_row(dst, src, q):  # row dst += q * row src
+        a[dst] = [x + q * y for x, y in zip(a[dst], a[src])]; u[dst] = [x + q * y for x, y in zip(u[dst], u[src])]
+        for row in u_inv: row[src] -= q * row[dst]
+    def swap_cols(i, j):
+        for mat in (a, v):
+            for row in mat: row[i], row[j] = row[j], row[i]
+    def add_col(dst, src, q):  # column dst += q * column src
+        for mat in (a, v):
+            for row in mat: row[dst] += q * row[src]
+
+    for t in range(min(m, n)):
+        while True:
+            pivots = [(abs(a[i][j]), i, j) for i in range(t, m) for j in range(t, n) if a[i][j]]
+            if not pivots: return u, a, v, u_inv
+            _, i, j = min(pivots)
+            swap_rows(t, i); swap_cols(t, j)
+            p = a[t][t]
+            for i in range(t + 1, m):
+                if a[i][t]: add_row(i, t, -(a[i][t] // p))
+            for j in range(t + 1, n):
+                if a[t][j]: add_col(j, t, -(a[t][j] // p))
+            if any(a[i][t] for i in range(t + 1, m)) or any(a[t][j] for j in range(t + 1, n)): continue
+            # Each pivot must divide everything after it; fold in a row that breaks that and go again.
+            bad = next((i for i in range(t + 1, m) for j in range(t + 1, n) if a[i][j] % p), None)
+            if bad is None: break
+            add_row(t, bad, 1)
+        if a[t][t] < 0:
+            a[t] = [-x for x in a[t]]; u[t] = [-x for x in u[t]]
+            for row in u_inv: row[t] = -row[t]
+    return u, a, v, u_inv
+
+
+class ClockSolver:
+    """The dial states (offsets mod 12, dials as in M's rows) one move template reaches, and amounts that reach them."""
+
+    def __init__(self, matrix):
+        u, d, v, u_inv = smith_normal_form(matrix)
+        rows, cols = len(d), len(d[0])
+        diag = [d[i][i] if i < cols else 0 for i in range(rows)]
+        # Row i of U s must be a multiple of g_i; y_i = (U s)_i / g_i times the inverse of d_i / g_i mod 12 / g_i.
+        self.g = np.array([math.gcd(x, 12) for x in diag], dtype=np.int64)
+        self.unit = np.array([pow(diag[i] // int(self.g[i]), -1, 12 // int(self.g[i])) if self.g[i] < 12 else 0
+                              for i in range(min(rows, cols))], dtype=np.int64)
+        self.u, self.v, self.u_inv = (np.array(x, dtype=object) % 12 for x in (u, v, u_inv))
+        self.u, self.v, self.u_inv = (x.astype(np.int64) for x in (self.u, self.v, self.u_inv))
+        self.moves = cols
+        self.size = math.prod(12 // int(g) for g in self.g)  # reachable states
+
+    def _amounts(self, z, rng=None):
+        k = len(self.unit)
+        y = np.zeros(z.shape[:-1] + (self.moves,), dtype=np.int64)
+        y[..., :k] = (z[..., :k] // self.g[:k]) * self.unit % (12 // self.g[:k])
+        if rng is not None:
+            # Plus a uniform element of the kernel: y_i is only fixed mod 12 / g_i, and columns past the diagonal are free.
+            y[..., :k] += rng.integers(0, self.g[:k], size=y[..., :k].shape) * (12 // self.g[:k])
+            y[..., k:] = rng.integers(0, 12, size=y[..., k:].shape)
+        return y @ self.v.T % 12
+
+    def solve(self, states):
+        """Move amounts (0..11) taking solved to each of `states` (offsets mod 12); raises on an unreachable state."""
+        z = (np.asarray(states) @ self.u.T) % 12
+        if (z % self.g).any(): raise ValueError("dial state not reachable with this move template")
+        return self._amounts(z)
+
+    def sample(self, n, rng):
+        """(states, amounts) for n states drawn uniformly from the reachable ones.
+
+        The amounts are drawn uniformly from every solution of each state, so
+        they come out uniform mod 12 as well and no move is always written as 0.
+        """
+        z = rng.integers(0, 12 // self.g, size=(n, len(self.g))) * self.g
+        return (z @ self.u_inv.T) % 12, self._amounts(z, rng)
+
+
+@lru_cache(maxsize=None)
+def get_clock_engine(mode):
+    return ClockEngine(mode)
+
+
+def clock_values(text, mode):
+    """Return (front, back) dial values (1..12) after applying a clock scramble from solved."""
+    return get_clock_engine(mode).values(text)
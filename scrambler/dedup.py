@@ -0,0 +1,145 @@
+"""A persistent index of issued final states, to keep duplicate scrambles out of packets.
+
+States are recorded by `PuzzleState` digest in SQLite, keyed by scope (one
+index can keep several series apart; the default scope spans every
+competition) and remember which packet position claimed them. `claim` is
+the authority: it inserts in one transaction, so of two exports racing for
+the same state only one gets it, and a packet that claims its own states
+again (a reprint) is let through.
+
+An in-memory Bloom filter over the same digests answers `seen` without
+touching the database for states that were never issued, which is most of
+them in a large bank. It is rebuilt from the table when the index is opened
+and only knows about states added since by this process, so it is a filter
+for bulk generators, not a guarantee.
+
+Unseeded exports redraw a scramble whose state is taken. Seeded packets (a
+seeded `export_pdf`, and `scrambler.build`, which is always seeded) claim
+their states too, but a clash is only reported: redrawing would break the
+promise that a seed reproduces its packet anywhere.
+
+Modes with fewer than MIN_STATES scramblable states (1x2x3 has 39) are left
+out: a shared index would run dry within a packet or two.
+"""
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from .generate import RANDOM_STATE_MIN_DISTANCE, distance_table
+from .paths import cache_dir
+from .state import state_digests
+
+BLOOM_BITS = 1 << 24  # 2 MB; about 1% false positives at 1.7 million states
+BLOOM_HASHES = 7
+DEFAULT_SCOPE = "global"
+MIN_STATES = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issued (
+    scope TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    mode TEXT NOT NULL,
+    source TEXT NOT NULL,
+    issued REAL NOT NULL,
+    PRIMARY KEY (scope, digest)
+) WITHOUT ROWID;
+"""
+
+
+def applies(mode):
+    """Whether `mode` has enough distinct scrambles for duplicate checks to be worth making."""
+    if mode not in RANDOM_STATE_MIN_DISTANCE: return True
+    return int((distance_table(mode).dist >= RANDOM_STATE_MIN_DISTANCE[mode]).sum()) >= MIN_STATES
+
+
+class BloomFilter:
+    def __init__(self, bits=BLOOM_BITS, hashes=BLOOM_HASHES):
+        self.bits, self.hashes = bits, hashes
+        self.array = np.zeros(bits // 8, dtype=np.uint8)
+
+    def _positions(self, digests):
+        # Double hashing: position i is h1 + i*h2, both halves taken from the digest itself.
+        d = np.frombuffer(b"".join(digests), dtype="<u4").reshape(-1, 2).astype(np.uint64)
+        i = np.arange(self.hashes, dtype=np.uint64)
+        return (d[:, :1] + i * (d[:, 1:] | np.uint64(1))) % np.uint64(self.bits)
+
+    def add(self, digests):
+        if not digests: return
+        pos = self._positions(digests).ravel()
+        np.bitwise_or.at(self.array, pos >> np.uint64(3), (1 << (pos & np.uint64(7))).astype(np.uint8))
+
+    def __contains__(self, digest):
+        return bool(self.contains([digest])[0])
+
+    def contains(self, digests):
+        if not digests: return np.zeros(0, dtype=bool)
+        pos = self._positions(digests)
+        return ((self.array[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+
+
+class DuplicateIndex:
+    def __init__(self, path=None, scope=DEFAULT_SCOPE):
+        self.path = path or os.path.join(cache_dir("dedup"), "issued.sqlite")
+        self.scope = scope
+        self.bloom = BloomFilter()
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            rows = db.execute("SELECT digest FROM issued WHERE scope=?", (scope,))
+            while batch := rows.fetchmany(100_000): self.bloom.add([d for d, in batch])
+        finally:
+            db.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def __len__(self):
+        db = self._connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM issued WHERE scope=?", (self.scope,)).fetchone()[0]
+        finally:
+            db.close()
+
+    def seen(self, mode, scrambles):
+        """For each scramble, whether its final state may already be issued (Bloom filter; false positives possible)."""
+        return self.bloom.contains(state_digests(mode, scrambles)).tolist()
+
+    def claim(self, mode, scrambles, sources):
+        """Record each scramble's final state as issued to `sources[i]`.
+
+        Returns one bool per scramble: False when the state already belongs to a
+        different source (or to an earlier scramble in this same call).
+        """
+        digests, now = state_digests(mode, scrambles), time.time()
+        results = []
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            for digest, source in zip(digests, sources):
+                if db.execute("INSERT OR IGNORE INTO issued VALUES (?, ?, ?, ?, ?)", (self.scope, digest, mode, source, now)).rowcount:
+                    results.append(True); continue
+                owner = db.execute("SELECT source FROM issued WHERE scope=? AND digest=?", (self.scope, digest)).fetchone()[0]
+                results.append(owner == source)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK"); raise
+        finally:
+            db.close()
+        self.bloom.add(digests)
+        return results
+
+    def release(self, packet, since=0.0):
+        """Forget the states claimed at or after `since` by sources in `packet` ("packet/..."); returns how many.
+
+        The Bloom filter keeps them, which `seen` may only err on the side of.
+        """
+        prefix = f"{packet}/"
+        db = self._connect()
+        try:
+            return db.execute("DELETE FROM issued WHERE scope=? AND substr(source, 1, ?)=? AND issued>=?",
+                              (self.scope, len(prefix), prefix, since)).rowcount
+        finally:
+            db.close()
@@ -0,0 +1,144 @@
+"""Compiled permutation engine for the sticker puzzles (cuboids, Ivy Cube, Pyraminx Duo).
+
+A puzzle state is a flat uint8 array with one colour code per sticker. Every move
+is compiled once into an index array `p` with `new_state = old_state[p]`, so a
+whole scramble composes into a single permutation and applying it is one gather,
+for one state or for a stack of N states.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import trace
+
+CUBE_COLORS = {'U': 'white', 'D': 'yellow', 'L': '#FF8C00', 'R': '#FF0000', 'F': '#00FF00', 'B': '#0000FF'}
+DUO_COLORS = {"G": "#39FF14", "Y": "#FFFF00", "P": "#FF1493", "B": "#00BFFF"}
+
+FACES = "URFDLB"
+SUFFIXES = ("", "2", "'")
+
+# Sticker cycles per face, in the order the content travels: (a, b, c) sends
+# a -> b -> c -> a. Two-element cycles are plain swaps. The number is the order
+# of the face turn; order-2 faces are half turns whatever suffix they carry.
+_SWAPS_332 = {
+    'R': [('U3', 'D3'), ('U6', 'D6'), ('U9', 'D9'), ('F3', 'B4'), ('F6', 'B1'), ('R1', 'R6'), ('R2', 'R5'), ('R3', 'R4')],
+    'L': [('U1', 'D1'), ('U4', 'D4'), ('U7', 'D7'), ('F1', 'B6'), ('F4', 'B3'), ('L1', 'L6'), ('L2', 'L5'), ('L3', 'L4')],
+    'F': [('U7', 'D3'), ('U8', 'D2'), ('U9', 'D1'), ('L3', 'R4'), ('L6', 'R1'), ('F1', 'F6'), ('F2', 'F5'), ('F3', 'F4')],
+    'B': [('U1', 'D9'), ('U2', 'D8'), ('U3', 'D7'), ('L1', 'R6'), ('L4', 'R3'), ('B1', 'B6'), ('B2', 'B5'), ('B3', 'B4')],
+}
+_MOVES = {
+    "duo": {
+        'U': (3, [("G0", "B0", "P0"), ("G1", "B3", "P2")]),
+        'R': (3, [("G0", "P0", "Y0"), ("G3", "P1", "Y3")]),
+        'L': (3, [("G0", "Y0", "B0"), ("G2", "Y2", "B1")]),
+        'B': (3, [("B0", "Y0", "P0"), ("B2", "Y1", "P3")]),
+    },
+    "ivy": {
+        'L': (3, [('L2', 'U2', 'F2'), ('L3', 'U1', 'F1')]),
+        'R': (3, [('R2', 'U2', 'B2'), ('R3', 'U3', 'B1')]),
+        'D': (3, [('D2', 'F2', 'R2'), ('D3', 'F3', 'R1')]),
+        'B': (3, [('B2', 'L2', 'D2'), ('B3', 'L1', 'D1')]),
+    },
+    "3x3x2": {
+        'U': (4, [('U1', 'U3', 'U9', 'U7'), ('U2', 'U6', 'U8', 'U4'), ('F1', 'L1', 'B1', 'R1'), ('F2', 'L2', 'B2', 'R2'), ('F3', 'L3', 'B3', 'R3')]),
+        'D': (4, [('D1', 'D3', 'D9', 'D7'), ('D2', 'D6', 'D8', 'D4'), ('F4', 'R4', 'B4', 'L4'), ('F5', 'R5', 'B5', 'L5'), ('F6', 'R6', 'B6', 'L6')]),
+        **{f: (2, swaps) for f, swaps in _SWAPS_332.items()},
+    },
+    "3x3x1": {
+        'R': (2, _SWAPS_332['R'][:3] + [('F3', 'B1'), ('R1', 'R3')]),
+        'L': (2, _SWAPS_332['L'][:3] + [('F1', 'B3'), ('L1', 'L3')]),
+        'F': (2, _SWAPS_332['F'][:3] + [('L3', 'R1'), ('F1', 'F3')]),
+        'B': (2, _SWAPS_332['B'][:3] + [('L1', 'R3'), ('B1', 'B3')]),
+    },
+    "1x2x3": {
+        'R': (2, [('F2', 'B5'), ('R1', 'R3'), ('U2', 'D2'), ('B1', 'F6'), ('F4', 'B3')]),
+        'U': (2, [('F1', 'B1'), ('L1', 'R1'), ('U1', 'U2'), ('B2', 'F2')]),
+        'D': (2, [('F5', 'B5'), ('L3', 'R3'), ('D1', 'D2'), ('B6', 'F6')]),
+    },
+    "2x2x3": {
+        'U': (4, [('U1', 'U2', 'U4', 'U3'), ('L1', 'B1', 'R1', 'F1'), ('L2', 'B2', 'R2', 'F2')]),
+        'D': (4, [('D1', 'D2', 'D4', 'D3'), ('F5', 'R5', 'B5', 'L5'), ('F6', 'R6', 'B6', 'L6')]),
+        'R': (2, [('U2', 'D2'), ('U4', 'D4'), ('F2', 'B5'), ('F4', 'B3'), ('F6', 'B1'), ('R1', 'R6'), ('R2', 'R5'), ('R3', 'R4')]),
+        'F': (2, [('U3', 'D2'), ('U4', 'D1'), ('L2', 'R5'), ('L4', 'R3'), ('L6', 'R1'), ('F1', 'F6'), ('F2', 'F5'), ('F3', 'F4')]),
+        'B': (2, [('U1', 'D4'), ('U2', 'D3'), ('L1', 'R6'), ('L3', 'R4'), ('L5', 'R2'), ('B1', 'B6'), ('B2', 'B5'), ('B3', 'B4')]),
+    },
+}
+
+
+def family(mode):
+    if mode == "Pyraminx Duo": return "duo"
+    if "Ivy" in mode: return "ivy"
+    if "3x3x2" in mode: return "3x3x2"
+    if "3x3x1" in mode: return "3x3x1"
+    if "1x2x3" in mode: return "1x2x3"
+    return "2x2x3"
+
+
+def sticker_layout(mode):
+    """Return [(label, colour)] for the solved puzzle, in state-array order."""
+    fam = family(mode)
+    if fam == "duo":
+        return [(f"{c}{i}", DUO_COLORS[c]) for c in "GYPB" for i in range(4)]
+    if fam == "ivy":
+        return [(f + i, CUBE_COLORS[f]) for f in 'UDLRFB' for i in '123']
+    if fam in ("3x3x2", "3x3x1"):
+        limit = 4 if fam == "3x3x1" else 7
+        return [(f'{f}{i}', CUBE_COLORS[f]) for f in 'UD' for i in range(1, 10)] + \
+               [(f'{f}{i}', CUBE_COLORS[f]) for f in 'LRFB' for i in range(1, limit)]
+    if fam == "1x2x3":
+        return [(f'{f}{i}', CUBE_COLORS[f]) for f in 'UD' for i in range(1, 3)] + \
+               [(f'{f}{i}', CUBE_COLORS[f]) for f in 'LRFB' for i in range(1, (3 if f in 'LR' else 6) + 1)]
+    return [(f'{f}{i}', CUBE_COLORS[f]) for f in 'UD' for i in range(1, 5)] + \
+           [(f'{f}{i}', CUBE_COLORS[f]) for f in 'LRFB' for i in range(1, 7)]
+
+
+class MoveEngine:
+    def __init__(self, mode):
+        self.mode = mode
+        layout = sticker_layout(mode)
+        self.labels = [label for label, _ in layout]
+        self.colors = list(dict.fromkeys(colour for _, colour in layout))
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.solved = np.array([self.colors.index(colour) for _, colour in layout], dtype=np.uint8)
+        self.identity = np.arange(len(self.labels), dtype=np.intp)
+        self.orders, self.powers = {}, {}
+        self.table = {}
+        for face in FACES:
+            order, cycles = _MOVES[family(mode)].get(face, (1, []))
+            base = self.identity.copy()
+            for cyc in cycles:
+                for i, label in enumerate(cyc):
+                    base[self.index[label]] = self.index[cyc[i-1]]
+            powers = [self.identity, base]
+            for _ in range(2, order): powers.append(powers[-1][base])
+            self.orders[face], self.powers[face] = order, powers[:order]
+            for suffix, amount in zip(SUFFIXES, (1, 2, -1)):
+                self.table[face + suffix] = powers[1 if order == 2 else amount % order]
+
+    def compile(self, moves):
+        """Compose a move string (parsed strictly and cached, see `notation`) or a token list into one permutation."""
+        if isinstance(moves, str):
+            from .notation import compiled
+            if trace.ENABLED: trace.count("moves_applied", len(moves.split()))
+            return compiled(self.mode, moves)
+        trace.count("moves_applied", len(moves))
+        perm = self.identity
+        for m in moves:
+            perm = perm[self.table[m]]
+        return perm
+
+    def apply(self, moves, states=None):
+        """Apply `moves` to a state, or to every row of an (N, stickers) stack of states."""
+        states = self.solved if states is None else states
+        return states[..., self.compile(moves)]
+
+    def is_solved(self, states):
+        return (np.asarray(states) == self.solved).all(axis=-1)
+
+    def to_dict(self, state):
+        return {label: self.colors[c] for label, c in zip(self.labels, state)}
+
+
+@lru_cache(maxsize=None)
+def get_engine(mode):
+    return MoveEngine(mode)
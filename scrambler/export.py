@@ -0,0 +1,302 @@
+"""PDF scramble packets, generated and rendered without Tk.
+
+Each round is an independent task: a worker process generates its scrambles
+and formats every diagram into PDF operators. The main process only lays the
+returned rows out into flowables, in round order, and writes the file.
+
+The packet is streamed: a round is laid out only when platypus asks for more
+flowables, and is dropped once its page is drawn, so the flowables in memory
+never cover more than one round. At most a few rounds are in flight in the
+worker pool at once.
+"""
+import multiprocessing
+import os
+import time
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from . import trace, vector
+from .dedup import applies as dedup_applies
+from .generate import generate_batch
+from .modes import is_clock
+from .seeding import seeded_round
+
+SCRAMBLES, EXTRAS = 5, 2
+FORM_BLEED = 6
+# Redraws allowed for one duplicate in an unseeded packet.
+DEDUP_ATTEMPTS = 3
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class PdfDiagram(Flowable):
+    """A diagram whose PDF operators were formatted ahead of time (see `vector.to_pdf_ops`).
+
+    `under` and `over` are (name, operators) for the mode's static artwork. Each
+    becomes one form XObject the first time it is drawn, and every later diagram
+    only references it.
+    """
+
+    def __init__(self, code, width, height, under=None, over=None):
+        super().__init__()
+        self.code, self.width, self.height, self.under, self.over = code, width, height, under, over
+
+    def wrap(self, avail_w, avail_h):
+        return self.width, self.height
+
+    def draw(self):
+        self._form(self.under)
+        self.canv.addLiteral(self.code)
+        self._form(self.over)
+
+    def _form(self, layer):
+        if layer is None: return
+        name, code = layer
+        if not self.canv.hasForm(name):
+            # Outlines may stroke a little past the box; the form's bbox would clip them.
+            self.canv.beginForm(name, -FORM_BLEED, -FORM_BLEED, self.width + FORM_BLEED, self.height + FORM_BLEED)
+            self.canv.addLiteral(code)
+            self.canv.endForm()
+        self.canv.doForm(name)
+
+
+def diagram_size(mode):
+    return (4.5*inch, 2.2*inch) if is_clock(mode) else (4.0*inch, 2.3*inch)
+
+
+@lru_cache(maxsize=None)
+def artwork(mode):
+    """(under, over) static-artwork forms for `mode`, as PdfDiagram takes them; None for an empty layer."""
+    w, h = diagram_size(mode)
+    slug = "".join(c for c in mode if c.isalnum())
+    return tuple((f"Art{slug}{side}", vector.to_pdf_ops(shapes, *vector.puzzle_size(mode), w, h)) if shapes else None
+                 for side, shapes in zip(("Under", "Over"), vector.static_layers(mode)))
+
+
+def render_round(mode, r_num, scrambles=None, seed=None):
+    """Pre-render one round's diagrams: [(scramble, pdf_ops)], the operators covering only the state layer (see `artwork`).
+
+    Unless given, the scrambles are generated here: from the competition `seed`'s
+    substreams for this round if there is one, otherwise from fresh entropy.
+    """
+    w, h = diagram_size(mode)
+    if scrambles is None:
+        count = SCRAMBLES + EXTRAS
+        scrambles = generate_batch(mode, count) if seed is None else seeded_round(seed, mode, r_num, count)
+    rows = []
+    for scr in scrambles:
+        with trace.span("render", mode=mode, round=r_num):
+            shapes = vector.state_layer(mode, **vector.scramble_state(mode, scr))
+            rows.append((scr, vector.to_pdf_ops(shapes, *vector.puzzle_size(mode), w, h)))
+    return rows
+
+
+def _render_round_traced(*args):
+    # Runs in a worker process: record there, and hand the spans back along with the rows.
+    trace.enable()
+    return render_round(*args), trace.take()
+
+
+def round_flowables(mode, r_num, rows, comp_name, comp_date, header_style, scramble_style, regular=SCRAMBLES):
+    """A round's page; rows after the first `regular` are laid out as extras."""
+    img_w, img_h = diagram_size(mode)
+    elements = [Table([
+        [Paragraph(f"<b>{comp_date}</b>", header_style), ""],
+        [Paragraph(f"<b>{comp_name}</b>", header_style), ""],
+        [Paragraph(f"<b>{mode} Round {r_num}</b>", header_style), ""]
+    ], colWidths=[400, 100]), Spacer(1, 15)]
+
+    for i, (scr, code) in enumerate(rows, start=1):
+        is_extra = (i > regular)
+        label = f"{i}" if not is_extra else f"E{i-regular}"
+        if i == regular + 1:
+            elements += [Spacer(1, 10), Paragraph("<b>Extra Scrambles</b>", header_style), Spacer(1, 5)]
+
+        row_content = [
+            Paragraph(f"<b>{label}</b>", header_style),
+            Paragraph(scr.replace(" y2 ", "<br/>y2<br/>"), scramble_style),
+            PdfDiagram(code, img_w, img_h, *artwork(mode))
+        ]
+        t = Table([row_content], colWidths=[0.4*inch, 1.8*inch, 4.6*inch])
+        t.setStyle(TableStyle([
+            ('GRID', (0,0), (-1,-1), 1, colors.black),
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('LEFTPADDING', (0,0), (-1,-1), 5),
+            ('RIGHTPADDING', (0,0), (-1,-1), 5),
+            ('BACKGROUND', (0,0), (0,0), colors.pink if is_extra else colors.white)
+        ]))
+        elements += [t, Spacer(1, 2)]
+    elements.append(PageBreak())
+    return elements
+
+
+class FlowableStream(list):
+    """A flowable list that refills itself from an iterator of chunks whenever platypus drains it."""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = iter(chunks)
+
+    def __len__(self):
+        while not super().__len__():
+            chunk = next(self.chunks, None)
+            if chunk is None: return 0
+            self.extend(chunk)
+        return super().__len__()
+
+
+def _in_order(executor, fn, tasks, window):
+    """Like executor.map, but with at most `window` tasks submitted ahead of the consumer."""
+    tasks, pending = iter(tasks), deque()
+    for args in tasks:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= window: break
+    try:
+        while pending:
+            result = pending.popleft().result()
+            args = next(tasks, None)
+            if args is not None: pending.append(executor.submit(fn, *args))
+            yield result
+    finally:
+        for future in pending: future.cancel()
+
+
+def render_rounds(mode, num_rounds, workers=None, executor=None, pool=None, seed=None):
+    """Yield each round's rows in order, using `executor` or a fresh process pool when it pays off.
+
+    With a `pool` (see `scrambler.pool`), each round's scrambles are taken from it just before the round is submitted.
+    A `seed` takes precedence: seeded rounds are regenerated from it, never drawn from the pool.
+    """
+    take = pool is not None and seed is None
+    tasks = ((mode, r_num, _take(pool, mode) if take else None, seed) for r_num in range(1, num_rounds + 1))
+    workers = min(workers or os.cpu_count() or 1, num_rounds)
+    if executor is None and workers <= 1:
+        for args in tasks: yield render_round(*args)
+        return
+    fn = _render_round_traced if trace.ENABLED else render_round
+    if executor is not None:
+        yield from _traced_results(_in_order(executor, fn, tasks, 2 * (workers or 1)))
+        return
+    # spawn, not fork: the caller may be a Tk process, and a forked Tk connection is not safe to share
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as processes:
+        yield from _traced_results(_in_order(processes, fn, tasks, 2 * workers))
+
+
+def _take(pool, mode):
+    with trace.span("pool.take", mode=mode):
+        return pool.take(mode, SCRAMBLES + EXTRAS)
+
+
+def _traced_results(results):
+    if not trace.ENABLED:
+        yield from results
+        return
+    for rows, recorded in results:
+        trace.merge(recorded)
+        yield rows
+
+
+def packet_name(comp_name, mode, seed):
+    """What a seeded packet's claims are recorded under, so every rendering of it (GUI, build) shares them."""
+    return f"{comp_name}|{mode}|seed={seed}"
+
+
+def claim_rows(dedup, mode, r_num, rows, packet):
+    """Claim each row's final state for its place in `packet`; False where another packet already has it."""
+    return dedup.claim(mode, [scr for scr, _ in rows], [f"{packet}/r{r_num}/{i}" for i in range(1, len(rows) + 1)])
+
+
+def unique_rows(dedup, mode, r_num, rows, packet, seed=None):
+    """Claim each row's final state in `dedup`, redrawing (and re-rendering) the scrambles that are taken.
+
+    A seeded packet is never redrawn: its scrambles are fixed by the seed, so it
+    matches every other rendering of that seed (`python -m scrambler --seed`,
+    `scrambler.build`, another machine). Its clashes are only counted.
+    """
+    if not dedup_applies(mode): return rows
+    claimed = claim_rows(dedup, mode, r_num, rows, packet)
+    if seed is not None:
+        trace.count("duplicates_kept", claimed.count(False))
+        return rows
+    rows = list(rows)
+    for i in (i for i, ok in enumerate(claimed) if not ok):
+        for _ in range(DEDUP_ATTEMPTS):
+            scr = generate_batch(mode, 1)[0]
+            if dedup.claim(mode, [scr], [f"{packet}/r{r_num}/{i + 1}"])[0]: break
+        else:
+            trace.count("duplicates_kept")
+            continue
+        rows[i] = render_round(mode, r_num, [scr])[0]
+    return rows
+
+
+def write_packet(filename, comp_name, comp_date, mode, rounds, seed=None, regular=SCRAMBLES):
+    """Lay out `rounds`, an iterable of (round number, rows) consumed one round at a time, into the PDF `filename`.
+
+    The file is built under a temporary name and only moved into place once complete.
+    With a competition `seed` it is byte-for-byte reproducible and records the seed in its metadata.
+    """
+    partial = f"{filename}.part"
+    meta = {} if seed is None else dict(invariant=1, subject=f"{comp_name} {mode} seed {seed}", keywords=[f"seed={seed}"])
+    doc = SimpleDocTemplate(partial, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30, pageCompression=1, **meta)
+    styles = getSampleStyleSheet()
+    header_style = ParagraphStyle('HeaderStyle', parent=styles['Normal'], fontSize=11, leading=14)
+    scramble_style = ParagraphStyle('ScrambleStyle', parent=styles['Normal'], fontSize=10, leading=13)
+
+    def chunks():
+        for r_num, rows in rounds:
+            with trace.span("layout", round=r_num):
+                yield round_flowables(mode, r_num, rows, comp_name, comp_date, header_style, scramble_style, regular)
+
+    try:
+        with trace.span("build", mode=mode):
+            doc.build(FlowableStream(chunks()))
+        os.replace(partial, filename)
+    finally:
+        if os.path.exists(partial): os.remove(partial)
+    return filename
+
+
+def export_pdf(filename, comp_name, comp_date, mode, num_rounds, workers=None, executor=None, pool=None, seed=None,
+               progress=None, cancel=None, dedup=None):
+    """Write the packet to `filename` (see `write_packet`), generating and rendering its rounds in worker processes.
+
+    With a `seed` the file is the same whatever `workers` is.
+    `progress(rounds_done, num_rounds)` is called from the building thread as each round is laid out. Setting the
+    `cancel` event stops the build before the next round with ExportCancelled, leaving no file behind.
+    With a `dedup` index (see `scrambler.dedup`), an unseeded packet prints no final state already issued
+    elsewhere; a seeded one only records its states. A cancelled or failed export releases what it claimed.
+    """
+    rounds = render_rounds(mode, num_rounds, workers, executor, pool, seed)
+    packet = packet_name(comp_name, mode, seed) if seed is not None else os.path.basename(filename)
+    started = time.time()
+
+    def ready_rounds():
+        for r_num in range(1, num_rounds + 1):
+            with trace.span("wait", round=r_num):
+                rows = next(rounds)
+            if cancel is not None and cancel.is_set(): raise ExportCancelled(filename)
+            if dedup is not None:
+                with trace.span("dedup", round=r_num):
+                    rows = unique_rows(dedup, mode, r_num, rows, packet, seed)
+            yield r_num, rows
+            if progress is not None: progress(r_num, num_rounds)
+
+    try:
+        return write_packet(filename, comp_name, comp_date, mode, ready_rounds(), seed)
+    except BaseException:
+        # No file, so nothing was issued: give back the states this run claimed (a reprint keeps the earlier claims).
+        if dedup is not None: dedup.release(packet, started)
+        raise
+    finally:
+        rounds.close()
+        trace.finish(f"{filename}.trace.json")
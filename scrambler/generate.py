@@ -0,0 +1,198 @@
+"""Scramble generation without the GUI.
+
+`generate_batch` samples whole banks of scrambles as NumPy arrays. The move
+adjacency rules are compiled into a small automaton whose states are the last
+two faces turned; counting the legal continuations of every state by dynamic
+programming gives per-state move probabilities under which each legal sequence
+of a given length is equally likely, and every draw is legal, so there is no
+rejection loop. The final states of all rows are computed in one batched
+permutation pass, and only the rows that came out solved are drawn again.
+
+Modes listed in RANDOM_STATE_MIN_DISTANCE are small enough for a full distance
+table; they get random-state scrambles instead (a uniform state at least that
+many moves from solved, written as its optimal solution).
+
+Clock modes are random-state too: a uniform draw from the dial states their
+move template reaches (which must be every state the puzzle has), written as
+the template amounts `clock.ClockSolver` solves for.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import trace
+from .clock import ClockSolver, get_clock_engine
+from .engine import FACES, get_engine
+from .modes import is_clock
+from .tables import get_table
+
+# mode -> (move set, (min length, max length))
+SPECS = {
+    "Pyraminx Duo": (["U", "U'", "L", "L'", "R", "R'", "B", "B'"], (6, 7)),
+    "3x3x2 Cuboid": (["U", "U'", "U2", "R2", "L2", "F2", "B2"], (25, 25)),
+    "3x3x1 Cuboid": (["R", "L", "F", "B"], (4, 8)),
+    "2x2x3 Cuboid": (["U", "U'", "U2", "D", "D'", "D2", "R2", "F2"], (10, 13)),
+    "1x2x3 Cuboid": (["U2", "D2", "R2"], (8, 10)),
+    "Ivy Cube": (["R", "R'", "L", "L'", "D", "D'", "B", "B'"], (7, 10)),
+}
+DEFAULT_SPEC = (["U2", "D2", "R2"], (10, 10))
+
+RANDOM_STATE_MIN_DISTANCE = {"1x2x3 Cuboid": 3, "3x3x1 Cuboid": 4, "Pyraminx Duo": 3, "Ivy Cube": 5}
+
+# mode -> (front moves, back moves after y2). Each must reach every dial state (see `clock_solver`).
+CLOCK_TEMPLATES = {
+    "Triangular": (["DR", "DL", "U", "R", "D", "L", "ALL"], ["DR", "DL", "U", "R", "D", "ALL"]),
+    "Pentagonal": (["UR", "DR", "DL", "UL", "UM", "L", "U", "R", "DRw", "DLw", "ALL"], ["UR", "DR", "DL", "UL", "L", "U", "R", "DRw", "DLw", "ALL"]),
+}
+DEFAULT_CLOCK_TEMPLATE = (["UR", "DR", "DL", "UL", "UM", "L", "U", "R", "DRw", "DLw", "ALL"], ["UR", "DR", "DL", "UL", "UM", "L", "U", "R", "DRw", "DLw", "ALL"])
+
+
+def move_spec(mode):
+    return SPECS.get(mode, DEFAULT_SPEC)
+
+
+def clock_template(mode):
+    return CLOCK_TEMPLATES.get(mode, DEFAULT_CLOCK_TEMPLATE)
+
+
+@lru_cache(maxsize=None)
+def clock_solver(mode):
+    engine = get_clock_engine(mode)
+    solver = engine.template_solver(*clock_template(mode))
+    if solver.size != ClockSolver(engine.matrix).size:
+        raise ValueError(f"{mode}: clock template reaches {solver.size} of {ClockSolver(engine.matrix).size} dial states")
+    return solver
+
+
+def distance_table(mode):
+    return get_table(mode, tuple(move_spec(mode)[0]))
+
+
+def load_tables():
+    """Build or map every random-state table up front, so the first scramble doesn't pay for it."""
+    for mode in RANDOM_STATE_MIN_DISTANCE: distance_table(mode)
+
+
+def _sandwich_faces(mode):
+    # X Y X with Y opposite X collapses to a shorter scramble (U D U == U2 D).
+    # U/D is banned everywhere; 3x3x2 also bans its R/L and F/B half turns.
+    mask = np.array([f in "UD" for f in FACES])
+    if mode == "3x3x2 Cuboid": mask[:] = True
+    return mask
+
+
+@lru_cache(maxsize=None)
+def move_automaton(mode, max_len=None):
+    """Compile the adjacency rules into (step, probs).
+
+    Automaton states are (last face, face before it), state 0 being the empty
+    sequence. step[s, m] is the state after move m, or -1 where m is illegal.
+    probs[r, s, m] is the chance of playing m from s with r moves still to go:
+    the share of legal r-move continuations that start with m, for r up to
+    `max_len` (default: the mode's longest scramble).
+    """
+    moves, (_, hi) = move_spec(mode)
+    hi = max_len or hi
+    faces = [FACES.index(m[0]) for m in moves]
+    sandwich = _sandwich_faces(mode)
+    states, step = [(-1, -1)], []
+    while len(step) < len(states):
+        p1, p2 = states[len(step)]
+        row = []
+        for f in faces:
+            if f == p1 or (p2 == f and p1 == (f + 3) % 6 and sandwich[f]): row.append(-1); continue
+            if (f, p1) not in states: states.append((f, p1))
+            row.append(states.index((f, p1)))
+        step.append(row)
+    step = np.array(step, dtype=np.intp)
+    # counts[r][s]: legal sequences of r moves from s. Python ints, since 25-move counts overflow int64.
+    counts = [[1] * len(states)]
+    for r in range(1, hi + 1):
+        counts.append([sum(counts[r-1][nxt] for nxt in row if nxt >= 0) for row in step.tolist()])
+    probs = np.zeros((hi + 1, len(states), len(moves)))
+    for r in range(1, hi + 1):
+        for s, row in enumerate(step.tolist()):
+            if counts[r][s]: probs[r, s] = [counts[r-1][nxt] / counts[r][s] if nxt >= 0 else 0 for nxt in row]
+    return step, probs
+
+
+def sample_moves(mode, n, rng, lengths=None):
+    """Sample (n, max_len) move indices into the mode's move set, -1 past each row's length.
+
+    Each row's length is uniform in the mode's range (or in `lengths`, a
+    (min, max) override), and given its length every legal sequence is equally likely.
+    """
+    moves, (lo, hi) = move_spec(mode)
+    lo, hi = lengths or (lo, hi)
+    step, probs = move_automaton(mode, hi)
+    cum = np.cumsum(probs, axis=2)
+    # Divide by the total so it is exactly 1: thresholds past the last legal move can then never be <= a draw in [0, 1).
+    cum = np.divide(cum, cum[..., -1:], out=np.ones_like(cum), where=cum[..., -1:] > 0)[..., :-1]
+    lengths = rng.integers(lo, hi + 1, size=n)
+    seqs = np.full((n, hi), -1, dtype=np.intp)
+    state = np.zeros(n, dtype=np.intp)
+    for t in range(hi):
+        rows = slice(None) if t < lo else np.flatnonzero(lengths > t)
+        choice = (cum[lengths[rows] - t, state[rows]] <= rng.random(len(state[rows]))[:, None]).sum(axis=1)
+        seqs[rows, t] = choice
+        state[rows] = step[state[rows], choice]
+    return seqs
+
+
+def final_states(mode, seqs):
+    """Apply every row of `seqs` to the solved puzzle in one batched pass."""
+    engine = get_engine(mode)
+    moves, _ = move_spec(mode)
+    perms = np.stack([engine.table[m] for m in moves] + [engine.identity])
+    states = np.broadcast_to(engine.solved, (len(seqs), len(engine.solved)))
+    if trace.ENABLED: trace.count("moves_applied", int((seqs >= 0).sum()))
+    for t in range(seqs.shape[1]):
+        states = np.take_along_axis(states, perms[seqs[:, t]], axis=1)
+    return states
+
+
+def sample_batch(mode, n, rng, stats=None, lengths=None):
+    """Return (seqs, states) for n unsolved scrambles of a sticker-puzzle mode."""
+    engine = get_engine(mode)
+    seqs = sample_moves(mode, n, rng, lengths)
+    states = final_states(mode, seqs)
+    redo = np.flatnonzero(engine.is_solved(states))
+    while redo.size:
+        if stats is not None: stats["resampled"] = stats.get("resampled", 0) + int(redo.size)
+        trace.count("resampled", int(redo.size))
+        seqs[redo] = sample_moves(mode, redo.size, rng, lengths)
+        states[redo] = final_states(mode, seqs[redo])
+        redo = redo[engine.is_solved(states[redo])]
+    return seqs, states
+
+
+def format_moves(mode, seqs):
+    moves, _ = move_spec(mode)
+    return [" ".join(moves[i] for i in row if i >= 0) for row in seqs]
+
+
+def sample_clock_amounts(mode, n, rng):
+    """Return (front, back) signed amounts in -5..6 reaching n uniformly random dial states; 0 and 6 are written with '+'."""
+    front, _ = clock_template(mode)
+    _, amounts = clock_solver(mode).sample(n, rng)
+    amounts = np.where(amounts > 6, amounts - 12, amounts)
+    return amounts[:, :len(front)], amounts[:, len(front):]
+
+
+def format_clock(mode, front_amounts, back_amounts):
+    front, back = clock_template(mode)
+    def part(names, row): return " ".join(f"{m}{abs(v)}{'-' if v < 0 else '+'}" for m, v in zip(names, row))
+    return [f"{part(front, f)} y2 {part(back, b)}" for f, b in zip(front_amounts.tolist(), back_amounts.tolist())]
+
+
+def generate_batch(mode, n, seed=None, stats=None):
+    """Generate n scramble strings for `mode`. `seed` is anything `numpy.random.default_rng` takes."""
+    with trace.span("generate", mode=mode, n=n):
+        rng = np.random.default_rng(seed)
+        if is_clock(mode):
+            return format_clock(mode, *sample_clock_amounts(mode, n, rng))
+        if mode in RANDOM_STATE_MIN_DISTANCE:
+            table = distance_table(mode)
+            return table.scrambles(table.sample_states(n, rng, RANDOM_STATE_MIN_DISTANCE[mode]), rng)
+        seqs, _ = sample_batch(mode, n, rng, stats)
+        return format_moves(mode, seqs)
@@ -0,0 +1,242 @@
+"""Puzzle diagram geometry as backend-neutral shapes.
+
+Coordinates are in Tk canvas space (origin top-left, y down). The Tk canvases
+and the vector backend both draw from these lists, so a diagram looks the same
+on screen and in the PDF.
+"""
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+from .modes import is_clock
+
+# kind is "polygon", "rect", "oval" or "line"; coords is a flat x, y list.
+# For lines the stroke colour is `fill`. `key` names the sticker a shape shows.
+Shape = namedtuple("Shape", "kind coords fill outline width smooth key", defaults=("black", 2, False, None))
+
+CUBOID_SIZE = (1100, 600)
+CLOCK_SIZE = 550
+
+
+def clock_theme(is_front):
+    if is_front:
+        return {"body": "#ffffff", "face": "#f78fb3", "pin": "#f78fb3", "marker": "#2d3436", "ptr": "#2d3436"}
+    return {"body": "#f78fb3", "face": "#ffffff", "pin": "#ffffff", "marker": "#2d3436", "ptr": "#f78fb3"}
+
+
+def ivy_face(x, y, f, size, rotated=False):
+    s = size
+    if not rotated:
+        shapes = [Shape("polygon", [x, y, x+s, y, x, y+s], None, key=f+'1'),
+                  Shape("polygon", [x+s, y+s, x+s, y, x, y+s], None, key=f+'3')]
+    else:
+        shapes = [Shape("polygon", [x, y+s, x, y, x+s, y+s], None, key=f+'1'),
+                  Shape("polygon", [x+s, y, x, y, x+s, y+s], None, key=f+'3')]
+
+    leaf_pts = []
+    steps = 20
+    if not rotated:
+        for i in range(steps + 1):
+            a = (math.pi/2) * (i/steps)
+            leaf_pts += [x + s * math.cos(a), y + s * math.sin(a)]
+        for i in range(steps + 1):
+            a = math.pi + (math.pi/2) * (i/steps)
+            leaf_pts += [x + s + s * math.cos(a), y + s + s * math.sin(a)]
+    else:
+        for i in range(steps + 1):
+            a = -math.pi/2 + (math.pi/2) * (i/steps)
+            leaf_pts += [x + s * math.cos(a), y + s + s * math.sin(a)]
+        for i in range(steps + 1):
+            a = math.pi/2 + (math.pi/2) * (i/steps)
+            leaf_pts += [x + s + s * math.cos(a), y + s * math.sin(a)]
+    shapes.append(Shape("polygon", leaf_pts, None, smooth=True, key=f+'2'))
+    return shapes
+
+
+def duo_face(cx, cy, prefix, side=120, inv_orient=False):
+    h = (side * math.sqrt(3)) / 2
+    d_base = h / 3
+    inner_s = side * 0.35
+    inner_h = (inner_s * math.sqrt(3)) / 2
+    inner_d = inner_h / 3
+
+    if not inv_orient:
+        v = [(cx, cy - 2*d_base), (cx - side/2, cy + d_base), (cx + side/2, cy + d_base)]
+    else:
+        v = [(cx, cy + 2*d_base), (cx - side/2, cy - d_base), (cx + side/2, cy - d_base)]
+
+    m = [((v[0][0]+v[1][0])/2, (v[0][1]+v[1][1])/2),
+         ((v[1][0]+v[2][0])/2, (v[1][1]+v[2][1])/2),
+         ((v[2][0]+v[0][0])/2, (v[2][1]+v[0][1])/2)]
+
+    def poly(pts, label):
+        return Shape("polygon", [c for p in pts for c in p], None, key=label)
+
+    iv = [(cx, cy-2*inner_d), (cx-inner_s/2, cy+inner_d), (cx+inner_s/2, cy+inner_d)] if not inv_orient else \
+         [(cx, cy+2*inner_d), (cx-inner_s/2, cy-inner_d), (cx+inner_s/2, cy-inner_d)]
+    return [poly([v[0], m[0], (cx, cy), m[2]], f"{prefix}1"),
+            poly([v[1], m[1], (cx, cy), m[0]], f"{prefix}2"),
+            poly([v[2], m[2], (cx, cy), m[1]], f"{prefix}3"),
+            poly(iv, f"{prefix}0")]
+
+
+@lru_cache(maxsize=None)
+def cuboid_layout(mode):
+    """Sticker outlines for a mode, with `fill` left as None; `cuboid_shapes` colours them in."""
+    if mode == "Pyraminx Duo":
+        side = 130
+        h = (side * math.sqrt(3)) / 2
+        gap = (h * 2/3) + 12
+        px, py = 550 + gap * math.cos(math.radians(30)), 180 - gap * math.sin(math.radians(30))
+        bx, by = 550 - gap * math.cos(math.radians(30)), 180 - gap * math.sin(math.radians(30))
+        return tuple(duo_face(550, 180, "G", side) + duo_face(550, 180 + gap, "Y", side, True) +
+                     duo_face(px, py, "P", side, True) + duo_face(bx, by, "B", side, True))
+
+    if "Ivy" in mode:
+        s, g = 100, 12
+        start_x, start_y = 250, 40
+        faces = [('U', start_x+s+g, start_y, True),
+                 ('L', start_x, start_y+s+g, True),
+                 ('F', start_x+s+g, start_y+s+g, False),
+                 ('R', start_x+2*(s+g), start_y+s+g, True),
+                 ('B', start_x+3*(s+g), start_y+s+g, False),
+                 ('D', start_x+s+g, start_y+2*(s+g), True)]
+        return tuple(shp for f, x, y, rot in faces for shp in ivy_face(x, y, f, s, rot))
+
+    s, p, g = 50, 3, 20
+    shapes = []
+    def draw_sq(x, y, label):
+        shapes.append(Shape("rect", [x, y, x+s, y+s], None, key=label))
+
+    start_x, start_y = 350, 40
+    if "3x3x" in mode:
+        rows = 1 if "3x3x1" in mode else 2
+        unit = 3 * (s + p)
+        for r in range(3):
+            for c in range(3): draw_sq(start_x + c*(s+p), start_y + r*(s+p), f"U{r*3+c+1}")
+        mid_y = start_y + unit + g
+        faces = [("L", start_x - unit - g), ("F", start_x), ("R", start_x + unit + g), ("B", start_x + 2*(unit + g))]
+        for f, fx in faces:
+            for r in range(rows):
+                for c in range(3): draw_sq(fx + c*(s+p), mid_y + r*(s+p), f"{f}{r*3+c+1}")
+        bot_y = mid_y + rows*(s+p) + g
+        for r in range(3):
+            for c in range(3): draw_sq(start_x + c*(s+p), bot_y + r*(s+p), f"D{r*3+c+1}")
+    else:
+        is_123 = "1x2x3" in mode
+        top_r = 1 if is_123 else 2
+        for r in range(top_r):
+            for c in range(2): draw_sq(start_x + c*(s+p), start_y + r*(s+p), f"U{r*2+c+1}")
+        mid_y = start_y + top_r*(s+p) + g
+        face_configs = [("L", 1 if is_123 else 2), ("F", 2), ("R", 1 if is_123 else 2), ("B", 2)]
+        curr_x = start_x - (1 if is_123 else 2)*(s+p) - g
+        for f, face_c in face_configs:
+            for r in range(3):
+                for c in range(face_c):
+                    draw_sq(curr_x + c*(s+p), mid_y + r*(s+p), f"{f}{r*face_c+c+1}")
+            curr_x += face_c*(s+p) + g
+        bot_y = mid_y + 3*(s+p) + g
+        for r in range(top_r):
+            for c in range(2): draw_sq(start_x + c*(s+p), bot_y + r*(s+p), f"D{r*2+c+1}")
+    return tuple(shapes)
+
+
+def cuboid_shapes(mode, state):
+    return [shp._replace(fill=state.get(shp.key, 'grey')) for shp in cuboid_layout(mode)]
+
+
+def pointer(cx, cy, radius, value, ptr_color):
+    angle_rad = math.radians(value * 30 - 90)
+    tip_x, tip_y = cx + radius * math.cos(angle_rad), cy + radius * math.sin(angle_rad)
+    base_w, angle_deg = 11, value * 30 - 90
+    l_x, l_y = cx + base_w * math.cos(math.radians(angle_deg - 110)), cy + base_w * math.sin(math.radians(angle_deg - 110))
+    r_x, r_y = cx + base_w * math.cos(math.radians(angle_deg + 110)), cy + base_w * math.sin(math.radians(angle_deg + 110))
+    return Shape("polygon", [l_x, l_y, tip_x, tip_y, r_x, r_y], ptr_color, "#2d3436", 1.5, True)
+
+
+def pointer_cap(cx, cy):
+    return Shape("oval", [cx-5, cy-5, cx+5, cy+5], "#ffffff", "#2d3436", 1.5)
+
+
+def clock_layout(mode):
+    """Return (lobe_pos, pin_positions, clock_pos, clock_r, marker_r, main_r, lobe_r) for a clock mode."""
+    lobe_pos, pin_positions, clock_pos = [], [], []
+    clock_r, marker_r = 40, 48
+    if mode == "Triangular":
+        lobe_pos, pin_positions = [(0, -185), (-190, 135), (190, 135)], [(0, -90), (-100, 75), (100, 75)]
+        clock_pos = [(0, -185), (-110, -35), (110, -35), (-190, 135), (0, 135), (190, 135)]
+        clock_r, marker_r, main_r, lobe_r = 52, 60, 230, 80
+    else:
+        lobe_dist, lobe_r, main_r = 195, 60, 225
+        lobe_pos = [(lobe_dist * math.cos(math.radians(i * 72 - 90)), lobe_dist * math.sin(math.radians(i * 72 - 90))) for i in range(5)]
+        pin_positions = [(110 * math.cos(math.radians(i * 72 - 18)), 110 * math.sin(math.radians(i * 72 - 18))) for i in range(5)]
+        for i in range(5):
+            clock_pos.append((190 * math.cos(math.radians(i * 72 - 90)), 190 * math.sin(math.radians(i * 72 - 90))))
+        for i in range(5):
+            clock_pos.append((155 * math.cos(math.radians(i * 72 - 54)), 155 * math.sin(math.radians(i * 72 - 54))))
+        if mode == "Super-Pentagonal": clock_pos.append((0, -30))
+    return lobe_pos, pin_positions, clock_pos, clock_r, marker_r, main_r, lobe_r
+
+
+def _clock_centers(mode, size):
+    center = size / 2
+    return [(center + dx, center + dy) for dx, dy in clock_layout(mode)[2]]
+
+
+@lru_cache(maxsize=None)
+def clock_base_shapes(mode, is_front, size=CLOCK_SIZE):
+    """Everything under the pointers: body outline, pins, dial faces and hour markers."""
+    theme, center = clock_theme(is_front), size / 2
+    lobe_pos, pin_positions, clock_pos, clock_r, marker_r, main_r, lobe_r = clock_layout(mode)
+
+    points = []
+    for angle in range(0, 360, 2):
+        rad = math.radians(angle)
+        max_d = main_r
+        centers = [(0, 0, main_r)] + [(pos[0], pos[1], lobe_r) for pos in lobe_pos]
+        for cx, cy, r in centers:
+            b, c = -2 * (cx * math.cos(rad) + cy * math.sin(rad)), cx**2 + cy**2 - r**2
+            delta = b**2 - 4*c
+            if delta >= 0:
+                d = (-b + math.sqrt(delta)) / 2
+                max_d = max(max_d, d)
+        points.extend([center + max_d * math.cos(rad), center + max_d * math.sin(rad)])
+
+    shapes = [Shape("polygon", points, theme["body"], "#f78fb3", 3, True)]
+    for px, py in pin_positions:
+        pcx, pcy = center + px, center + py
+        shapes.append(Shape("oval", [pcx-16, pcy-16, pcx+16, pcy+16], theme["pin"], "#2d3436" if is_front else "#ffffff", 2.5))
+    for cx, cy in _clock_centers(mode, size):
+        shapes.append(Shape("oval", [cx-clock_r, cy-clock_r, cx+clock_r, cy+clock_r], theme["face"], "#f78fb3", 1.5))
+        for h in range(12):
+            a = math.radians(h * 30 - 90)
+            if h == 0:
+                shapes.append(Shape("line", [cx+(marker_r-4)*math.cos(a), cy+(marker_r-4)*math.sin(a), cx+(marker_r+4)*math.cos(a), cy+(marker_r+4)*math.sin(a)], "#ff0066", None, 4))
+            else:
+                px, py = cx+marker_r*math.cos(a), cy+marker_r*math.sin(a)
+                shapes.append(Shape("oval", [px-2, py-2, px+2, py+2], theme["marker"], None, 1))
+    return tuple(shapes)
+
+
+@lru_cache(maxsize=None)
+def clock_cap_shapes(mode, size=CLOCK_SIZE):
+    """The pointer hubs, drawn over the pointers."""
+    return tuple(pointer_cap(cx, cy) for cx, cy in _clock_centers(mode, size))
+
+
+@lru_cache(maxsize=None)
+def _pointer_table(mode, is_front, size):
+    clock_r, ptr_color = clock_layout(mode)[3], clock_theme(is_front)["ptr"]
+    return [[pointer(cx, cy, clock_r, v, ptr_color) for v in range(12)] for cx, cy in _clock_centers(mode, size)]
+
+
+def clock_pointer_shapes(mode, values, is_front, size=CLOCK_SIZE):
+    """One pointer per dial; dials beyond `values` point at 12. Pointers come from a per-mode table."""
+    return [dial[(values[i] if i < len(values) else 12) % 12] for i, dial in enumerate(_pointer_table(mode, is_front, size))]
+
+
+def clock_shapes(mode, values, is_front, size=CLOCK_SIZE):
+    if not is_clock(mode): return []
+    # Dials never overlap, so drawing all faces, then all pointers, then all hubs
+    # looks the same as drawing each dial complete in turn.
+    return [*clock_base_shapes(mode, is_front, size), *clock_pointer_shapes(mode, values, is_front, size), *clock_cap_shapes(mode, size)]
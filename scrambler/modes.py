@@ -0,0 +1,17 @@
+"""Mode names and the family checks shared by the GUI and the headless code."""
+
+MODES = ["Triangular", "Pentagonal", "Super-Pentagonal", "1x2x3 Cuboid", "2x2x3 Cuboid", "3x3x2 Cuboid", "3x3x1 Cuboid", "Ivy Cube", "Pyraminx Duo"]
+CLOCK_MODES = ["Triangular", "Pentagonal", "Super-Pentagonal"]
+
+
+def find_mode(name):
+    """The mode called `name`, ignoring case, or None."""
+    return next((mode for mode in MODES if mode.lower() == name.lower()), None)
+
+
+def is_clock(mode):
+    return "Cuboid" not in mode and "Ivy" not in mode and "Pyraminx" not in mode
+
+
+def clock_count(mode):
+    return {"Triangular": 6, "Pentagonal": 10, "Super-Pentagonal": 11}.get(mode, 11)
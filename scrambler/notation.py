@@ -0,0 +1,112 @@
+"""Scramble notation: one strict tokenizer per puzzle family, cached compilation and simplification.
+
+Sticker puzzles read `<face>[2|']` tokens into (face, amount) opcodes, with
+the amount reduced modulo the face's order (an order-2 face is a half turn
+whatever its suffix, as in the engine). Clock puzzles read `<pins><n><+|->`
+tokens and `y2` into per-move coefficients. Anything else raises ValueError
+naming the token, instead of being skipped.
+
+`simplify` merges and cancels moves that meet on one face. On the cuboids,
+opposite faces turn parallel layers and commute, so merging also looks
+through the other face of the same axis: `U D U'` is `D`.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from .clock import get_clock_engine
+from .engine import FACES, family, get_engine
+
+CACHE_SIZE = 4096
+
+_STICKER_TOKEN = re.compile(r"([URFDLB])(2|'|’)?")
+_CLOCK_TOKEN = re.compile(r"([A-Za-z]+)(\d+)([+\-−])")
+_SUFFIX_AMOUNT = {None: 1, "2": 2, "'": -1, "’": -1}
+
+# Families whose opposite faces are parallel layers (so U and D commute).
+_LAYERED = {"3x3x2", "3x3x1", "1x2x3", "2x2x3"}
+# 3x3x1 writes its half turns without a suffix (R, not R2).
+_HALF_TURN = {"3x3x1": ""}
+
+
+def _malformed(mode, i, tok):
+    return ValueError(f"{mode}: malformed move {tok!r} (token {i + 1})")
+
+
+def tokenize(mode, text):
+    """Sticker-puzzle opcodes [(face, amount)] with 0 < amount < order; a turn of a face the puzzle lacks is malformed."""
+    orders, ops = get_engine(mode).orders, []
+    for i, tok in enumerate(text.split()):
+        match = _STICKER_TOKEN.fullmatch(tok)
+        if not match: raise _malformed(mode, i, tok)
+        face, suffix = match.groups()
+        order = orders[face]
+        if order == 1: raise _malformed(mode, i, tok)  # a face this puzzle doesn't turn
+        amount = 1 if order == 2 else _SUFFIX_AMOUNT[suffix] % order
+        if amount: ops.append((face, amount))
+    return ops
+
+
+def _commute(fam, a, b):
+    return a == b or (fam in _LAYERED and FACES.index(a) % 3 == FACES.index(b) % 3)
+
+
+def simplify_ops(mode, ops):
+    fam, orders, out = family(mode), get_engine(mode).orders, []
+    for face, amount in ops:
+        j = len(out) - 1
+        while j >= 0 and out[j][0] != face and _commute(fam, out[j][0], face): j -= 1
+        if j >= 0 and out[j][0] == face:
+            merged = (out[j][1] + amount) % orders[face]
+            if merged: out[j] = (face, merged)
+            else: del out[j]
+        else:
+            out.append((face, amount))
+    return out
+
+
+def format_ops(mode, ops):
+    fam, orders = family(mode), get_engine(mode).orders
+    def suffix(face, amount):
+        if orders[face] == 2: return _HALF_TURN.get(fam, "2")
+        if amount == 1: return ""
+        return "'" if amount == orders[face] - 1 else "2"
+    return " ".join(face + suffix(face, amount) for face, amount in ops)
+
+
+def simplify(mode, text):
+    """The shortest equivalent spelling `simplify_ops` finds, e.g. "U U' R2" -> "R2"."""
+    return format_ops(mode, simplify_ops(mode, tokenize(mode, text)))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compiled(mode, text):
+    """The permutation a sticker scramble applies (read-only; shared by every caller)."""
+    engine = get_engine(mode)
+    perm = engine.identity
+    for face, amount in simplify_ops(mode, tokenize(mode, text)):
+        perm = perm[engine.powers[face][amount]]
+    perm = perm.copy() if perm is engine.identity else perm
+    perm.flags.writeable = False
+    return perm
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clock_coefficients(mode, text):
+    """Summed signed amount per clock move column, front moves then those after y2 (read-only)."""
+    engine = get_clock_engine(mode)
+    coeffs, is_back = np.zeros(engine.matrix.shape[1], dtype=np.int64), False
+    for i, tok in enumerate(text.split()):
+        if tok.lower() == "y2":
+            is_back = True; continue
+        match = _CLOCK_TOKEN.fullmatch(tok)
+        if not match: raise _malformed(mode, i, tok)
+        cmd, val, sign = match.groups()
+        try:
+            column = engine.column(cmd, is_back)
+        except ValueError:
+            raise _malformed(mode, i, tok) from None
+        coeffs[column] += int(val) if sign == "+" else -int(val)
+    coeffs.flags.writeable = False
+    return coeffs
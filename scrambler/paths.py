@@ -0,0 +1,9 @@
+"""Where the scrambler keeps files it can rebuild: distance tables and other caches."""
+import os
+
+
+def cache_dir(*parts):
+    root = os.environ.get("SCRAMBLER_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "odd-clock-scrambler")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,152 @@
+"""A per-mode bank of pre-generated scrambles, kept in SQLite and topped up in the background.
+
+Each row holds the scramble and a hash of the state it leaves the puzzle in.
+Rows are tagged with a fingerprint of how the mode is generated, so changing
+a move set or template retires the old stock instead of handing it out.
+`take` marks rows issued inside one write transaction, so two consumers
+(threads or processes) never get the same scramble; a short pool is made up
+on the spot rather than blocking.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from .dedup import applies as dedup_applies
+from .generate import RANDOM_STATE_MIN_DISTANCE, clock_template, generate_batch, move_spec
+from .modes import is_clock
+from .paths import cache_dir
+from .state import state_digests
+
+# Bumped when the table layout changes; the pool is a cache, so an old file is simply left behind.
+POOL_VERSION = 2
+POOL_TARGET = 100
+REFILL_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrambles (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    scramble TEXT NOT NULL,
+    state_hash TEXT NOT NULL,
+    created REAL NOT NULL,
+    issued REAL
+);
+CREATE INDEX IF NOT EXISTS scrambles_free ON scrambles (mode, spec, issued, id);
+"""
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def spec_key(mode):
+    """Fingerprint of everything that decides how `mode` is scrambled."""
+    spec = clock_template(mode) if is_clock(mode) else (move_spec(mode), RANDOM_STATE_MIN_DISTANCE.get(mode))
+    return _digest(f"{mode}|{spec!r}".encode())
+
+
+def state_hashes(mode, scrambles):
+    return [d.hex() for d in state_digests(mode, scrambles)]
+
+
+class ScramblePool:
+    def __init__(self, path=None, target=POOL_TARGET, dedup=None):
+        """With a `dedup` index (see `scrambler.dedup`), refills skip states it has already seen issued."""
+        self.path = path or os.path.join(cache_dir("pool"), f"scrambles-v{POOL_VERSION}.sqlite")
+        self.target, self.dedup = target, dedup
+        self.modes, self.wanted = [], threading.Event()
+        self.stopping, self.thread = threading.Event(), None
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        # One short-lived connection per call: sqlite3 connections can't be shared across threads.
+        return _Connection(self.path)
+
+    def available(self, mode):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM scrambles WHERE mode=? AND spec=? AND issued IS NULL",
+                              (mode, spec_key(mode))).fetchone()[0]
+
+    def add(self, mode, scrambles, issued=False):
+        now, spec = time.time(), spec_key(mode)
+        rows = [(mode, spec, scr, h, now, now if issued else None)
+                for scr, h in zip(scrambles, state_hashes(mode, scrambles))]
+        with self._connect() as db:
+            db.executemany("INSERT INTO scrambles (mode, spec, scramble, state_hash, created, issued) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def refill(self, mode, target=None):
+        """Top `mode` up to `target` unissued scrambles; returns how many were added."""
+        missing = (target or self.target) - self.available(mode)
+        for start in range(0, max(missing, 0), REFILL_CHUNK):
+            if self.stopping.is_set(): break
+            batch = generate_batch(mode, min(REFILL_CHUNK, missing - start))
+            if self.dedup is not None and dedup_applies(mode): batch = [scr for scr, seen in zip(batch, self.dedup.seen(mode, batch)) if not seen]
+            self.add(mode, batch)
+        return max(missing, 0)
+
+    def take(self, mode, n):
+        """Issue n scrambles, oldest first. Whatever the pool can't cover is generated now."""
+        with self._connect() as db:
+            rows = db.execute("SELECT id, scramble FROM scrambles WHERE mode=? AND spec=? AND issued IS NULL ORDER BY id LIMIT ?",
+                              (mode, spec_key(mode), n)).fetchall()
+            db.executemany("UPDATE scrambles SET issued=? WHERE id=?", [(time.time(), i) for i, _ in rows])
+        scrambles = [scr for _, scr in rows]
+        if len(scrambles) < n:
+            extra = generate_batch(mode, n - len(scrambles))
+            self.add(mode, extra, issued=True)
+            scrambles += extra
+        self.wanted.set()
+        return scrambles
+
+    def start(self, modes):
+        """Keep `modes` topped up from a daemon thread; the first mode listed is filled first."""
+        self.modes = list(modes)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="scramble-pool", daemon=True)
+            self.thread.start()
+        self.wanted.set()
+
+    def prefer(self, mode):
+        """Move `mode` to the front of the refill order, e.g. when the GUI switches to it."""
+        self.modes = [mode] + [m for m in self.modes if m != mode]
+        self.wanted.set()
+
+    def stop(self):
+        self.stopping.set(); self.wanted.set()
+        if self.thread is not None: self.thread.join()
+        self.thread = None
+
+    def _run(self):
+        while not self.stopping.is_set():
+            self.wanted.wait()
+            self.wanted.clear()
+            for mode in list(self.modes):
+                if self.stopping.is_set(): break
+                self.refill(mode)
+
+
+class _Connection:
+    """sqlite3 connection as a context manager that commits (or rolls back) and closes.
+
+    The write lock is taken up front (BEGIN IMMEDIATE), so a select-then-update
+    in `take` can't interleave with another writer.
+    """
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        self.db.close()
@@ -0,0 +1,35 @@
+"""Reproducible scrambles from one competition seed.
+
+Every scramble gets its own NumPy stream, derived from the competition seed
+and its (event, round, index) position with `SeedSequence` spawn keys. Any
+single scramble can be regenerated without the ones before it, and a packet
+comes out the same however its rounds are split between worker processes.
+"""
+import hashlib
+
+import numpy as np
+
+from .generate import generate_batch
+
+
+def new_seed():
+    """A fresh 64-bit competition seed, short enough to print on a packet."""
+    return int(np.random.SeedSequence().generate_state(2, np.uint32).view(np.uint64)[0])
+
+
+def event_key(mode):
+    # Python's hash() is salted per process; this must be the same everywhere.
+    return int.from_bytes(hashlib.blake2b(mode.encode(), digest_size=4).digest(), "big")
+
+
+def scramble_seed(seed, mode, round_num, index):
+    return np.random.SeedSequence(seed, spawn_key=(event_key(mode), round_num, index))
+
+
+def seeded_scramble(seed, mode, round_num, index):
+    """Scramble `index` (1-based; extras follow the regular ones) of `mode` round `round_num`."""
+    return generate_batch(mode, 1, seed=scramble_seed(seed, mode, round_num, index))[0]
+
+
+def seeded_round(seed, mode, round_num, count):
+    return [seeded_scramble(seed, mode, round_num, i) for i in range(1, count + 1)]
@@ -0,0 +1,213 @@
+"""A local HTTP service for scrambles and diagrams: python -m scrambler.server [--port 8765].
+
+    GET /modes                                        JSON list of modes
+    GET /scramble?mode=M[&n=N]                        {"mode": M, "scrambles": [...]} from the scramble pool
+    GET /scramble?mode=M&seed=S&round=R[&n=N|&index=I]  that round (or scramble) of a seeded packet
+    GET /diagram.svg?mode=M&scramble=S                diagram of the state S leaves a solved puzzle in
+    GET /diagram.png?mode=M&scramble=S[&scale=X]      the same, rasterised (needs Pillow)
+
+Query strings are form-encoded, so a clock scramble's "+" must be sent as %2B.
+Connections are HTTP/1.1 keep-alive and served concurrently on one asyncio
+loop; generation and rendering run in worker threads, so a slow render never
+holds up another screen. Rendered diagrams stay in an LRU keyed by mode and
+final state, so every scramble that reaches a state (and every client asking
+for it) shares one render, and concurrent misses for the same state wait on
+the one render already running.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from . import vector
+from .generate import generate_batch
+from .modes import MODES, find_mode
+from .state import PuzzleState
+
+DIAGRAM_CACHE = 512
+MAX_BATCH = 1000
+MAX_SCALE = 4.0
+IDLE_TIMEOUT = 30
+MAX_HEAD = 16 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DiagramCache:
+    """An LRU of render futures, so a render in flight is shared as well as a finished one."""
+
+    def __init__(self, size=DIAGRAM_CACHE):
+        self.size, self.items = size, OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key, render):
+        """The future for `key`, starting `render()` in a worker thread on a miss. Loop thread only."""
+        future = self.items.get(key)
+        if future is not None and not (future.done() and (future.cancelled() or future.exception())):
+            self.items.move_to_end(key)
+            self.hits += 1
+            return future
+        self.misses += 1
+        future = self.items[key] = asyncio.ensure_future(asyncio.to_thread(render))
+        while len(self.items) > self.size: self.items.popitem(last=False)
+        return future
+
+
+def _param(query, name, cast=str, default=None, minimum=None):
+    values = query.get(name)
+    if not values:
+        if default is None: raise HttpError(HTTPStatus.BAD_REQUEST, f"missing parameter {name!r}")
+        return default
+    try:
+        value = cast(values[0])
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"bad value for {name!r}: {values[0]!r}") from None
+    if minimum is not None and value < minimum: raise HttpError(HTTPStatus.BAD_REQUEST, f"{name} must be at least {minimum}")
+    return value
+
+
+def _mode(query):
+    name = _param(query, "mode")
+    mode = find_mode(name)
+    if mode is not None: return mode
+    raise HttpError(HTTPStatus.BAD_REQUEST, f"unknown mode {name!r}")
+
+
+class ScrambleServer:
+    def __init__(self, pool=None, cache_size=DIAGRAM_CACHE):
+        """Scrambles come from `pool` (a started `ScramblePool`) when given, otherwise straight from `generate_batch`."""
+        self.pool, self.diagrams = pool, DiagramCache(cache_size)
+
+    async def scrambles(self, query, mode):
+        n = _param(query, "n", int, 1)
+        if not 1 <= n <= MAX_BATCH: raise HttpError(HTTPStatus.BAD_REQUEST, f"n must be 1..{MAX_BATCH}")
+        if "seed" in query:
+            from .seeding import seeded_round, seeded_scramble
+            seed, round_num = _param(query, "seed", int, minimum=0), _param(query, "round", int, minimum=1)
+            if "index" in query:
+                return [await asyncio.to_thread(seeded_scramble, seed, mode, round_num, _param(query, "index", int, minimum=1))]
+            return await asyncio.to_thread(seeded_round, seed, mode, round_num, n)
+        if self.pool is not None: return await asyncio.to_thread(self.pool.take, mode, n)
+        return await asyncio.to_thread(generate_batch, mode, n)
+
+    async def diagram(self, query, fmt):
+        mode, scramble = _mode(query), _param(query, "scramble")
+        scale = _param(query, "scale", float, 1.0) if fmt == "png" else 1.0
+        if not 0 < scale <= MAX_SCALE: raise HttpError(HTTPStatus.BAD_REQUEST, f"scale must be in (0, {MAX_SCALE}]")
+        try:
+            state = PuzzleState.from_scramble(mode, scramble)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+        def render():
+            shapes, w, h = vector.puzzle_shapes(mode, **vector.state_kwargs(state))
+            return vector.to_png(shapes, w, h, scale) if fmt == "png" else vector.to_svg(shapes, w, h).encode()
+        # Shielded: a client hanging up mustn't cancel a render other clients are waiting on.
+        return await asyncio.shield(self.diagrams.get((mode, state.digest(), fmt, scale), render))
+
+    async def route(self, path, query):
+        """(content type, body, cacheable) for a GET of `path`."""
+        if path == "/modes":
+            return "application/json", json.dumps(MODES).encode(), True
+        if path == "/scramble":
+            mode = _mode(query)
+            scrambles = await self.scrambles(query, mode)
+            return "application/json", json.dumps({"mode": mode, "scrambles": scrambles}).encode(), "seed" in query
+        if path in ("/diagram.svg", "/diagram.png"):
+            fmt = path.rsplit(".", 1)[1]
+            return ("image/svg+xml" if fmt == "svg" else "image/png"), await self.diagram(query, fmt), True
+        raise HttpError(HTTPStatus.NOT_FOUND, f"no such endpoint {path!r}")
+
+    async def respond(self, method, target):
+        if method not in ("GET", "HEAD"): raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not supported")
+        url = urlsplit(target)
+        return await self.route(url.path, parse_qs(url.query))
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until the client closes it, asks to, or goes idle."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                headers = dict((k.strip().lower(), v.strip()) for k, _, v in (line.partition(":") for line in lines[1:] if line))
+                try:
+                    method, target, version = lines[0].split()
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0: raise ValueError(length)
+                except ValueError:
+                    await self._send(writer, "HTTP/1.1", HTTPStatus.BAD_REQUEST, "text/plain", b"malformed request\n", False, False)
+                    return
+                # Nothing here takes a body; skip a small one, but don't let a client make us buffer a large one.
+                if length > MAX_HEAD:
+                    await self._send(writer, version, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "text/plain", b"request body too large\n", False, False)
+                    return
+                if length: await reader.readexactly(length)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                try:
+                    content_type, body, cacheable = await self.respond(method, target)
+                    status = HTTPStatus.OK
+                except HttpError as e:
+                    status, content_type, body, cacheable = e.status, "text/plain", f"{e}\n".encode(), False
+                except Exception as e:
+                    status, content_type, body, cacheable = HTTPStatus.INTERNAL_SERVER_ERROR, "text/plain", f"{type(e).__name__}: {e}\n".encode(), False
+                await self._send(writer, version, status, content_type, b"" if method == "HEAD" else body, keep_alive, cacheable, len(body))
+                if not keep_alive: return
+        finally:
+            writer.close()
+
+    async def _send(self, writer, version, status, content_type, body, keep_alive, cacheable, length=None):
+        head = [f"{version if version in ('HTTP/1.0', 'HTTP/1.1') else 'HTTP/1.1'} {status.value} {status.phrase}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body) if length is None else length}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                f"Cache-Control: {'public, max-age=86400' if cacheable else 'no-store'}",
+                "Access-Control-Allow-Origin: *"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD)
+        if ready is not None: ready(server)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m scrambler.server", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1; 0.0.0.0 for the venue network)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-pool", action="store_true", help="generate every scramble on request instead of from the scramble pool")
+    parser.add_argument("--cache", type=int, default=DIAGRAM_CACHE, help=f"rendered diagrams to keep (default {DIAGRAM_CACHE})")
+    args = parser.parse_args(argv)
+    pool = None
+    if not args.no_pool:
+        from .pool import ScramblePool
+        pool = ScramblePool()
+        pool.start(MODES)
+    server = ScrambleServer(pool, args.cache)
+    def ready(srv): print(f"serving on {', '.join(str(s.getsockname()[:2]) for s in srv.sockets)}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if pool is not None: pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
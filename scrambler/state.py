@@ -0,0 +1,80 @@
+"""Compact, hashable puzzle states.
+
+A PuzzleState is the mode plus one byte per sticker (the engine's colour code)
+or per dial (1..12, front dials then back), with its hash computed once. It
+replaces label -> colour dicts wherever states are compared or stored; `digest`
+is a short hash that, unlike `hash`, is the same in every process and run.
+"""
+import hashlib
+
+import numpy as np
+
+from .clock import get_clock_engine
+from .engine import get_engine
+from .modes import is_clock
+
+DIGEST_SIZE = 8
+
+
+def _digest(mode, data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE, person=mode.encode()[:16]).digest()
+
+
+class PuzzleState:
+    __slots__ = ("mode", "data", "_hash")
+
+    def __init__(self, mode, data):
+        self.mode = mode
+        self.data = data if isinstance(data, bytes) else np.asarray(data, dtype=np.uint8).tobytes()
+        self._hash = hash((mode, self.data))
+
+    @classmethod
+    def solved(cls, mode):
+        if is_clock(mode): return cls(mode, [12] * get_clock_engine(mode).matrix.shape[0])
+        return cls(mode, get_engine(mode).solved)
+
+    @classmethod
+    def from_scramble(cls, mode, scramble):
+        return cls.solved(mode).apply(scramble)
+
+    def array(self):
+        return np.frombuffer(self.data, dtype=np.uint8)
+
+    def apply(self, moves):
+        if is_clock(self.mode):
+            engine = get_clock_engine(self.mode)
+            coeffs = engine.coefficients(moves)
+            return PuzzleState(self.mode, (self.array().astype(np.int64) + coeffs @ engine.matrix.T - 1) % 12 + 1)
+        return PuzzleState(self.mode, get_engine(self.mode).apply(moves, self.array()))
+
+    def is_solved(self):
+        return self == PuzzleState.solved(self.mode)
+
+    def digest(self):
+        return _digest(self.mode, self.data)
+
+    def to_dict(self):
+        """Sticker label -> colour, as the geometry code draws them (sticker puzzles only)."""
+        return get_engine(self.mode).to_dict(self.data)
+
+    def __eq__(self, other):
+        return isinstance(other, PuzzleState) and self._hash == other._hash and self.mode == other.mode and self.data == other.data
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"PuzzleState({self.mode!r}, {self.data.hex()})"
+
+
+def state_arrays(mode, scrambles):
+    """(N, stickers or dials) uint8 final states of `scrambles`, matching PuzzleState.data."""
+    if is_clock(mode):
+        engine = get_clock_engine(mode)
+        return engine.apply(np.stack([engine.coefficients(scr) for scr in scrambles])).astype(np.uint8)
+    engine = get_engine(mode)
+    return np.stack([engine.apply(scr) for scr in scrambles])
+
+
+def state_digests(mode, scrambles):
+    return [_digest(mode, row.tobytes()) for row in state_arrays(mode, scrambles)]
@@ -0,0 +1,123 @@
+"""BFS distance tables for the puzzles small enough to enumerate.
+
+A table is every reachable state with its optimal distance under the mode's
+scramble move set, sorted by state key and stored as one structured `.npy`
+file. The file name carries a fingerprint of the sticker layout and compiled
+moves, so a table is rebuilt only when the move definitions change, and it is
+memory-mapped on load.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import get_engine
+from .paths import cache_dir
+
+TABLE_VERSION = 1
+
+
+def _keys(states):
+    # Colour codes are stored +1 so no key byte is NUL; numpy drops trailing NULs from "S" values.
+    states = np.ascontiguousarray(np.asarray(states, dtype=np.uint8) + 1)
+    return states.view(f"S{states.shape[-1]}").reshape(states.shape[:-1])
+
+
+def _fingerprint(engine, moves):
+    h = hashlib.sha256(f"{TABLE_VERSION}|{engine.mode}|{' '.join(moves)}".encode())
+    h.update(engine.solved.tobytes())
+    for m in moves: h.update(engine.table[m].astype(np.int32).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _bfs(engine, moves):
+    perms = np.stack([engine.table[m] for m in moves])
+    frontier = engine.solved[None]
+    known = _keys(frontier)
+    keys, dists = [known], [np.zeros(1, np.uint8)]
+    d = 0
+    while len(frontier):
+        d += 1
+        nxt = frontier[:, perms].reshape(-1, perms.shape[1])
+        k, idx = np.unique(_keys(nxt), return_index=True)
+        new = ~np.isin(k, known)
+        frontier, k = nxt[idx[new]], k[new]
+        known = np.union1d(known, k)
+        keys.append(k); dists.append(np.full(len(k), d, np.uint8))
+    keys, dists = np.concatenate(keys), np.concatenate(dists)
+    order = np.argsort(keys)
+    table = np.empty(len(keys), dtype=[("key", keys.dtype), ("dist", np.uint8)])
+    table["key"], table["dist"] = keys[order], dists[order]
+    return table
+
+
+class DistanceTable:
+    def __init__(self, mode, moves, data):
+        self.engine, self.moves, self.data = get_engine(mode), list(moves), data
+        self.keys, self.dist = data["key"], data["dist"]
+        self.perms = np.stack([self.engine.table[m] for m in self.moves])
+        inverse = {self.engine.table[m].tobytes(): m for m in self.moves}
+        self.inverse = [inverse[np.argsort(self.engine.table[m]).tobytes()] for m in self.moves]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def index(self, states):
+        """Row of each state (any leading shape) in the table; raises on an unreachable state."""
+        keys = _keys(states)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        if not (self.keys[pos] == keys).all(): raise ValueError(f"{self.engine.mode}: state not reachable with {self.moves}")
+        return pos
+
+    def distance(self, states):
+        """Optimal distance of each state (any leading shape); raises on an unreachable state."""
+        return self.dist[self.index(states)]
+
+    def states(self, rows=slice(None)):
+        """The table's states (all of them, or those at `rows`) as (N, stickers) colour arrays."""
+        keys = np.ascontiguousarray(self.keys[rows])
+        return np.frombuffer(keys.tobytes(), dtype=np.uint8).reshape(len(keys), -1) - 1
+
+    def sample_states(self, n, rng, min_dist=0):
+        """Draw n states uniformly from those at least `min_dist` moves from solved."""
+        eligible = np.flatnonzero(self.dist >= min_dist)
+        return self.states(eligible[rng.integers(0, len(eligible), size=n)])
+
+    def solve(self, states, rng):
+        """Optimal solutions for a stack of states, as lists of move-set indices.
+
+        Each step picks uniformly among the moves that bring a row one closer to solved.
+        """
+        states = np.array(states, dtype=np.uint8)
+        dist = self.distance(states).astype(np.int64)
+        paths = [[] for _ in range(len(states))]
+        for _ in range(int(dist.max(initial=0))):
+            rows = np.flatnonzero(dist > 0)
+            nxt = states[rows][:, self.perms]
+            closer = self.distance(nxt) == (dist[rows] - 1)[:, None]
+            pick = np.argmax(np.where(closer, rng.random(closer.shape), -1), axis=1)
+            states[rows] = nxt[np.arange(len(rows)), pick]
+            dist[rows] -= 1
+            for r, m in zip(rows.tolist(), pick.tolist()): paths[r].append(m)
+        return paths
+
+    def scrambles(self, states, rng):
+        """Move strings that take the solved puzzle to each of `states` in the fewest moves."""
+        return [" ".join(self.inverse[m] for m in reversed(path)) for path in self.solve(states, rng)]
+
+
+@lru_cache(maxsize=None)
+def get_table(mode, moves):
+    """Load (memory-mapped) or build the distance table for `mode` under the tuple of `moves`."""
+    engine = get_engine(mode)
+    for m in moves:
+        # A move the engine doesn't define compiles to the identity and would silently shrink the table.
+        if (engine.table[m] == engine.identity).all(): raise ValueError(f"{mode}: move {m!r} does nothing")
+    slug = mode.lower().replace(" ", "-")
+    path = os.path.join(cache_dir("tables"), f"{slug}-{_fingerprint(engine, moves)}.npy")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f: np.save(f, _bfs(engine, moves))
+        os.replace(tmp, path)
+    return DistanceTable(mode, moves, np.load(path, mmap_mode="r"))
@@ -0,0 +1,97 @@
+"""Opt-in timing spans and counters, written as a Chrome/Perfetto trace.
+
+Tracing is off unless SCRAMBLER_TRACE is set (to 1, or to the path the trace
+should go to) or `enable()` is called, e.g. by a --trace flag. While it is
+off, `span` hands back one shared no-op context manager and `count` returns
+at once, so instrumented code pays a global lookup and a call.
+
+Worker processes record their own spans; `export` ships them back with each
+round and `merge` adds them here, so one trace covers the whole pool.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+ENABLED = bool(os.environ.get("SCRAMBLER_TRACE"))
+PATH = os.environ.get("SCRAMBLER_TRACE") if os.environ.get("SCRAMBLER_TRACE") not in (None, "", "1") else None
+
+_NULL = nullcontext()
+_events = []
+_counters = Counter()
+
+
+def enable(path=None):
+    global ENABLED, PATH
+    ENABLED, PATH = True, path or PATH
+
+
+def reset():
+    _events.clear(); _counters.clear()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+
+    def __enter__(self):
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.time_ns()
+        # Wall-clock microseconds, so spans from different processes line up on one timeline.
+        _events.append({"name": self.name, "ph": "X", "ts": self.start / 1000, "dur": (end - self.start) / 1000,
+                        "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args})
+
+
+def span(name, **args):
+    return _Span(name, args) if ENABLED else _NULL
+
+
+def count(name, n=1):
+    if ENABLED: _counters[name] += n
+
+
+def take():
+    """Remove and return everything recorded so far, for shipping back from a worker."""
+    events, counters = list(_events), dict(_counters)
+    reset()
+    return events, counters
+
+
+def merge(recorded):
+    events, counters = recorded
+    _events.extend(events); _counters.update(counters)
+
+
+def summary():
+    """A per-stage table: calls, total/mean/max milliseconds, then the counters."""
+    stages = defaultdict(list)
+    for ev in _events: stages[ev["name"]].append(ev["dur"] / 1000)
+    lines = [f"{'stage':<16} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, durs in sorted(stages.items(), key=lambda kv: -sum(kv[1])):
+        lines.append(f"{name:<16} {len(durs):>7} {sum(durs):>10.1f} {sum(durs) / len(durs):>9.3f} {max(durs):>9.3f}")
+    lines += [f"{name:<16} {value:>7}" for name, value in sorted(_counters.items())]
+    return "\n".join(lines)
+
+
+def write(path):
+    counters = [{"name": name, "ph": "C", "ts": time.time_ns() / 1000, "pid": os.getpid(), "args": {name: value}}
+                for name, value in _counters.items()]
+    with open(path, "w") as f: json.dump({"traceEvents": _events + counters, "displayTimeUnit": "ms"}, f)
+
+
+def finish(default_path):
+    """Write the trace (to PATH if one was configured) and print the summary to stderr, then start afresh."""
+    if not ENABLED: return None
+    path = PATH or default_path
+    write(path)
+    print(summary(), f"trace written to {path}", sep="\n", file=sys.stderr)
+    reset()
+    return path
@@ -0,0 +1,214 @@
+"""Vector output (raw PDF operators and SVG) for the shapes in `geometry`, plus PNG.
+
+reportlab is only imported by the PDF path, and Pillow only by
+`to_png`; SVG output needs nothing beyond the standard library.
+
+Smoothed polygons follow Tk's `smooth=True` rule: the outline runs through the
+midpoint of every edge, using each vertex as the quadratic control point.
+"""
+from functools import lru_cache
+
+from . import geometry, trace
+from .clock import clock_values
+from .engine import get_engine
+from .modes import is_clock
+
+CLOCK_PAD = 20
+
+
+def _smooth_segments(coords):
+    pts = list(zip(coords[0::2], coords[1::2]))
+    n = len(pts)
+    mids = [((pts[i][0] + pts[(i+1) % n][0]) / 2, (pts[i][1] + pts[(i+1) % n][1]) / 2) for i in range(n)]
+    segments = []
+    for i, (px, py) in enumerate(pts):
+        (ax, ay), (bx, by) = mids[i-1], mids[i]
+        segments.append((ax + 2/3*(px-ax), ay + 2/3*(py-ay), bx + 2/3*(px-bx), by + 2/3*(py-by), bx, by))
+    return mids[-1], segments
+
+
+@lru_cache(maxsize=None)
+def _color(c):
+    from reportlab.lib import colors
+    return colors.toColor(c) if c else None
+
+
+def _fit(width, height, box_w, box_h):
+    scale = min(box_w / width, box_h / height)
+    return scale, (box_w - width * scale) / 2, box_h - (box_h - height * scale) / 2
+
+
+def translate(shapes, dx, dy):
+    return [shp._replace(coords=[c + (dx if i % 2 == 0 else dy) for i, c in enumerate(shp.coords)]) for shp in shapes]
+
+
+def puzzle_size(mode):
+    if not is_clock(mode): return geometry.CUBOID_SIZE
+    return 2 * geometry.CLOCK_SIZE + 4 * CLOCK_PAD, geometry.CLOCK_SIZE
+
+
+def _both_faces(shapes_for):
+    # Clock faces are laid out side by side with the same padding as the GUI's clock frame.
+    size = geometry.CLOCK_SIZE
+    return translate(shapes_for(True), CLOCK_PAD, 0) + translate(shapes_for(False), size + 3 * CLOCK_PAD, 0)
+
+
+def puzzle_shapes(mode, state=None, front=None, back=None):
+    """Return (shapes, width, height) for a cuboid `state` dict or clock `front`/`back` dial values."""
+    if not is_clock(mode):
+        return geometry.cuboid_shapes(mode, state), *puzzle_size(mode)
+    size = geometry.CLOCK_SIZE
+    shapes = _both_faces(lambda is_front: geometry.clock_shapes(mode, front if is_front else back, is_front, size))
+    return shapes, *puzzle_size(mode)
+
+
+@lru_cache(maxsize=None)
+def static_layers(mode):
+    """(under, over): the artwork every diagram of `mode` shares, drawn below and above `state_layer`.
+
+    For clocks that is the bodies, pins and markings under the pointers and the
+    hubs over them. Sticker puzzles have none: splitting each sticker into a fill
+    and a shared outline costs more operators than it saves.
+    """
+    if not is_clock(mode): return (), ()
+    size = geometry.CLOCK_SIZE
+    return (tuple(_both_faces(lambda is_front: geometry.clock_base_shapes(mode, is_front, size))),
+            tuple(_both_faces(lambda is_front: geometry.clock_cap_shapes(mode, size))))
+
+
+def state_layer(mode, state=None, front=None, back=None):
+    """The state-dependent shapes that go between the static layers: the pointers, or every sticker."""
+    if not is_clock(mode): return geometry.cuboid_shapes(mode, state)
+    size = geometry.CLOCK_SIZE
+    return _both_faces(lambda is_front: geometry.clock_pointer_shapes(mode, front if is_front else back, is_front, size))
+
+
+def scramble_state(mode, scramble):
+    """The puzzle_shapes/state_layer keyword arguments for the state `scramble` leaves a solved puzzle in."""
+    with trace.span("apply", mode=mode):
+        if is_clock(mode):
+            front, back = clock_values(scramble, mode)
+            return dict(front=front, back=back)
+        engine = get_engine(mode)
+        return dict(state=engine.to_dict(engine.apply(scramble)))
+
+
+def state_kwargs(state):
+    """The same keyword arguments for a `PuzzleState`."""
+    if not is_clock(state.mode): return dict(state=state.to_dict())
+    values = state.array().tolist()
+    return dict(front=values[:len(values) // 2], back=values[len(values) // 2:])
+
+
+def scramble_shapes(mode, scramble):
+    state = scramble_state(mode, scramble)
+    with trace.span("shapes", mode=mode):
+        return puzzle_shapes(mode, **state)
+
+
+def _pdf_rgb(c, op):
+    col = _color(c)
+    return f"{col.red:.3f} {col.green:.3f} {col.blue:.3f} {op}"
+
+
+def _pdf_path(shp):
+    c = shp.coords
+    if shp.kind == "line":
+        return f"{c[0]:.2f} {c[1]:.2f} m {c[2]:.2f} {c[3]:.2f} l"
+    if shp.kind == "rect":
+        return f"{min(c[0], c[2]):.2f} {min(c[1], c[3]):.2f} {abs(c[2]-c[0]):.2f} {abs(c[3]-c[1]):.2f} re"
+    if shp.kind == "oval":
+        cx, cy, rx, ry = (c[0]+c[2])/2, (c[1]+c[3])/2, abs(c[2]-c[0])/2, abs(c[3]-c[1])/2
+        kx, ky = rx * 0.5523, ry * 0.5523
+        return (f"{cx+rx:.2f} {cy:.2f} m {cx+rx:.2f} {cy+ky:.2f} {cx+kx:.2f} {cy+ry:.2f} {cx:.2f} {cy+ry:.2f} c "
+                f"{cx-kx:.2f} {cy+ry:.2f} {cx-rx:.2f} {cy+ky:.2f} {cx-rx:.2f} {cy:.2f} c "
+                f"{cx-rx:.2f} {cy-ky:.2f} {cx-kx:.2f} {cy-ry:.2f} {cx:.2f} {cy-ry:.2f} c "
+                f"{cx+kx:.2f} {cy-ry:.2f} {cx+rx:.2f} {cy-ky:.2f} {cx+rx:.2f} {cy:.2f} c h")
+    if shp.smooth:
+        (sx, sy), segments = _smooth_segments(c)
+        return f"{sx:.2f} {sy:.2f} m " + " ".join("%.2f %.2f %.2f %.2f %.2f %.2f c" % seg for seg in segments) + " h"
+    return f"{c[0]:.2f} {c[1]:.2f} m " + " ".join(f"{x:.2f} {y:.2f} l" for x, y in zip(c[2::2], c[3::2])) + " h"
+
+
+def to_pdf_ops(shapes, width, height, box_w, box_h):
+    """PDF content-stream operators drawing `shapes` fitted into a `box_w` x `box_h` box at the origin.
+
+    Plain strings pickle cheaply, so worker processes can do all of the
+    per-diagram formatting and the main process only pastes the result into the page.
+    """
+    with trace.span("pdf_ops", shapes=len(shapes)):
+        return _pdf_ops(shapes, width, height, box_w, box_h)
+
+
+def _pdf_ops(shapes, width, height, box_w, box_h):
+    scale, tx, ty = _fit(width, height, box_w, box_h)
+    ops, fill, stroke, lw = ["q", f"{scale:.5f} 0 0 {-scale:.5f} {tx:.2f} {ty:.2f} cm", "1 j"], None, None, None
+    for shp in shapes:
+        fill_c, stroke_c = (None, shp.fill) if shp.kind == "line" else (shp.fill, shp.outline)
+        if fill_c and fill_c != fill: ops.append(_pdf_rgb(fill_c, "rg")); fill = fill_c
+        if stroke_c and stroke_c != stroke: ops.append(_pdf_rgb(stroke_c, "RG")); stroke = stroke_c
+        if stroke_c and shp.width != lw: ops.append(f"{shp.width} w"); lw = shp.width
+        ops.append(_pdf_path(shp) + (" B" if fill_c and stroke_c else " f" if fill_c else " S"))
+    ops.append("Q")
+    return "\n".join(ops)
+
+
+def to_svg(shapes, width, height):
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">']
+    for shp in shapes:
+        stroke = f'stroke="{shp.outline}" stroke-width="{shp.width}" stroke-linejoin="round"' if shp.outline else 'stroke="none"'
+        c = shp.coords
+        if shp.kind == "line":
+            out.append(f'<line x1="{c[0]:.2f}" y1="{c[1]:.2f}" x2="{c[2]:.2f}" y2="{c[3]:.2f}" stroke="{shp.fill}" stroke-width="{shp.width}"/>')
+        elif shp.kind == "rect":
+            out.append(f'<rect x="{min(c[0], c[2]):.2f}" y="{min(c[1], c[3]):.2f}" width="{abs(c[2]-c[0]):.2f}" height="{abs(c[3]-c[1]):.2f}" fill="{shp.fill}" {stroke}/>')
+        elif shp.kind == "oval":
+            out.append(f'<ellipse cx="{(c[0]+c[2])/2:.2f}" cy="{(c[1]+c[3])/2:.2f}" rx="{abs(c[2]-c[0])/2:.2f}" ry="{abs(c[3]-c[1])/2:.2f}" fill="{shp.fill}" {stroke}/>')
+        elif shp.smooth:
+            (sx, sy), segments = _smooth_segments(c)
+            d = f"M{sx:.2f},{sy:.2f}" + "".join("C" + " ".join(f"{v:.2f}" for v in seg) for seg in segments) + "Z"
+            out.append(f'<path d="{d}" fill="{shp.fill}" {stroke}/>')
+        else:
+            pts = " ".join(f"{x:.2f},{y:.2f}" for x, y in zip(c[0::2], c[1::2]))
+            out.append(f'<polygon points="{pts}" fill="{shp.fill}" {stroke}/>')
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _flatten(coords, steps=8):
+    (x, y), segments = _smooth_segments(coords)
+    pts = [(x, y)]
+    for ax, ay, bx, by, ex, ey in segments:
+        for i in range(1, steps + 1):
+            t = i / steps; u = 1 - t
+            pts.append((u*u*u*x + 3*u*u*t*ax + 3*u*t*t*bx + t*t*t*ex, u*u*u*y + 3*u*u*t*ay + 3*u*t*t*by + t*t*t*ey))
+        x, y = ex, ey
+    return pts
+
+
+def to_png(shapes, width, height, scale=1.0, supersample=2):
+    """PNG bytes of `shapes` on a transparent `width` x `height` canvas times `scale`.
+
+    Pillow doesn't antialias, so the image is drawn `supersample` times larger and scaled down.
+    """
+    import io
+    from PIL import Image, ImageDraw
+    k = scale * supersample
+    img = Image.new("RGBA", (max(1, round(width * k)), max(1, round(height * k))), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for shp in shapes:
+        w = max(1, round(shp.width * k))
+        c = [v * k for v in shp.coords]
+        if shp.kind == "line":
+            draw.line(c, fill=shp.fill, width=w)
+        elif shp.kind == "rect":
+            draw.rectangle([min(c[0], c[2]), min(c[1], c[3]), max(c[0], c[2]), max(c[1], c[3])], fill=shp.fill or None, outline=shp.outline, width=w)
+        elif shp.kind == "oval":
+            draw.ellipse([min(c[0], c[2]), min(c[1], c[3]), max(c[0], c[2]), max(c[1], c[3])], fill=shp.fill or None, outline=shp.outline, width=w)
+        else:
+            pts = _flatten(c) if shp.smooth else list(zip(c[0::2], c[1::2]))
+            draw.polygon(pts, fill=shp.fill or None, outline=shp.outline, width=w)
+    if supersample > 1: img = img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache(tmp_path_factory):
+    """Keep tables, dedup indexes and build caches out of the user's cache; worker processes inherit it."""
+    path = tmp_path_factory.mktemp("cache")
+    old, os.environ["SCRAMBLER_CACHE"] = os.environ.get("SCRAMBLER_CACHE"), str(path)
+    yield path
+    if old is None: os.environ.pop("SCRAMBLER_CACHE")
+    else: os.environ["SCRAMBLER_CACHE"] = old
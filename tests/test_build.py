@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from scrambler.build import build, load_manifest
+from scrambler.dedup import DuplicateIndex
+
+
+def manifest(tmp_path, name="Comp", **event):
+    path = os.path.join(tmp_path, "comp.json")
+    with open(path, "w") as f:
+        json.dump({"name": name, "date": "2026-10-18", "seed": 5, "events": [{"mode": "Ivy Cube", "rounds": 2, **event}]}, f)
+    return path
+
+
+def test_build_claims_its_states_and_reports_clashes(tmp_path):
+    dedup, lines = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite")), []
+    build(manifest(tmp_path), dedup=dedup, log=lines.append)
+    assert len(dedup) == 14 and "already issued" not in lines[-1]
+    # Another competition on the same seed gets the same scrambles, which are kept but reported.
+    build(manifest(tmp_path, "Other"), os.path.join(tmp_path, "other"), dedup=dedup, log=lines.append)
+    assert len(dedup) == 14 and "14 scramble(s) already issued elsewhere" in lines[-1]
+
+
+def test_rebuild_only_regenerates_changed_rounds(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCRAMBLER_CACHE", os.path.join(tmp_path, "cache"))
+    lines, out = [], os.path.join(tmp_path, "packets")
+    build(manifest(tmp_path), out, log=lines.append)
+    assert "2 generated, 0 from cache" in lines[-1]
+    build(manifest(tmp_path), out, log=lines.append)
+    assert "up to date" in lines[-1]
+    build(manifest(tmp_path, rounds=3), out, log=lines.append)
+    assert "1 generated, 2 from cache" in lines[-1]
+    build(manifest(tmp_path, rounds=3, extras=1), out, log=lines.append)
+    assert "3 generated, 0 from cache" in lines[-1]
+    # A new competition name only lays the pages out again.
+    build(manifest(tmp_path, "Renamed", rounds=3, extras=1), out, log=lines.append)
+    assert "0 generated, 3 from cache" in lines[-1]
+
+
+def test_manifest_needs_a_seed(tmp_path):
+    path = os.path.join(tmp_path, "comp.json")
+    with open(path, "w") as f:
+        json.dump({"name": "Comp", "date": "2026-10-18", "events": [{"mode": "Ivy Cube", "rounds": 1}, {"mode": "Pentagonal", "rounds": 1, "seed": 3}]}, f)
+    with pytest.raises(ValueError, match="event 1: missing 'seed'"):
+        load_manifest(path)
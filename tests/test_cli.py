@@ -0,0 +1,18 @@
+import pytest
+
+from scrambler.__main__ import main
+
+
+def test_seeded_round(capsys):
+    assert main(["Ivy Cube", "--seed", "3", "--round", "1", "-n", "3"]) == 0
+    rows = capsys.readouterr().out.splitlines()
+    assert main(["Ivy Cube", "--seed", "3", "--round", "1", "--index", "2"]) == 0
+    assert capsys.readouterr().out.splitlines() == rows[1:2]
+
+
+@pytest.mark.parametrize("args", [["-n", "-2"], ["-n", "0"], ["--seed", "-1"], ["--seed", "x"], ["--seed", "3", "--round", "0"],
+                                  ["--seed", "3", "--round", "1", "--index", "0"]])
+def test_rejects_out_of_range_numbers(args, capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(["Ivy Cube"] + args)
+    assert exit.value.code == 2 and "at least" in capsys.readouterr().err
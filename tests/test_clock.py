@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from scrambler.clock import ClockSolver, clock_values, get_clock_engine, smith_normal_form
+from scrambler.generate import clock_solver, clock_template, generate_batch, sample_clock_amounts
+from scrambler.modes import CLOCK_MODES, clock_count
+from scrambler.state import state_arrays
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_batch_apply_matches_single(mode):
+    engine = get_clock_engine(mode)
+    coeffs = np.stack([engine.coefficients(scr) for scr in generate_batch(mode, 50, seed=12)])
+    assert (engine.apply(coeffs) == np.stack([engine.apply(c) for c in coeffs])).all()
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_all_moves_every_front_dial(mode):
+    front, back = clock_values("ALL1+", mode)
+    assert front == [1] * clock_count(mode) and len(back) == clock_count(mode)
+    assert clock_values("ALL1+ ALL2-", mode)[0] == [11] * clock_count(mode)
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_smith_normal_form(mode):
+    engine = get_clock_engine(mode)
+    for matrix in (engine.matrix, engine.template_matrix(*clock_template(mode))):
+        u, d, v, u_inv = (np.array(x, dtype=object) for x in smith_normal_form(matrix))
+        assert (u @ np.array(matrix.tolist(), dtype=object) @ v == d).all()
+        assert (u @ u_inv == np.eye(len(u), dtype=int)).all()
+        assert not d[~np.eye(*d.shape, dtype=bool)].any()
+        diag = [int(x) for x in np.diagonal(d) if x]
+        assert all(b % a == 0 for a, b in zip(diag, diag[1:]))
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_template_reaches_every_state(mode):
+    assert clock_solver(mode).size == ClockSolver(get_clock_engine(mode).matrix).size
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_sampled_amounts_reach_sampled_states(mode):
+    matrix, solver = get_clock_engine(mode).template_matrix(*clock_template(mode)), clock_solver(mode)
+    states, amounts = solver.sample(500, np.random.default_rng(7))
+    assert ((amounts @ matrix.T) % 12 == states).all()
+    assert ((solver.solve(states) @ matrix.T) % 12 == states).all()
+
+
+@pytest.mark.parametrize("mode", CLOCK_MODES)
+def test_scramble_strings_apply(mode):
+    engine = get_clock_engine(mode)
+    front, back = sample_clock_amounts(mode, 200, np.random.default_rng(8))
+    expected = engine.apply(np.hstack([front, back]), engine.template_matrix(*clock_template(mode)))
+    assert (state_arrays(mode, generate_batch(mode, 200, seed=8)) == expected).all()
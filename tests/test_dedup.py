@@ -0,0 +1,42 @@
+import os
+import time
+
+import numpy as np
+
+from scrambler.dedup import BloomFilter, DuplicateIndex, applies
+from scrambler.generate import generate_batch
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom, rng = BloomFilter(bits=1 << 16), np.random.default_rng(9)
+    digests = [rng.bytes(8) for _ in range(2000)]
+    bloom.add(digests[:1000])
+    assert bloom.contains(digests[:1000]).all()
+    assert bloom.contains(digests[1000:]).mean() < 0.05
+    assert digests[0] in bloom
+
+
+def test_claim(tmp_path):
+    index = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite"))
+    scrambles = generate_batch("Ivy Cube", 3, seed=10)
+    assert index.claim("Ivy Cube", scrambles, ["a/1", "a/2", "a/3"]) == [True, True, True]
+    assert index.claim("Ivy Cube", scrambles[:2], ["a/1", "b/1"]) == [True, False]
+    assert index.seen("Ivy Cube", scrambles) == [True, True, True]
+    # The index reloads its filter from the table.
+    reopened = DuplicateIndex(index.path)
+    assert len(reopened) == 3 and reopened.seen("Ivy Cube", scrambles) == [True, True, True]
+
+
+def test_small_modes_are_left_out():
+    assert not applies("1x2x3 Cuboid") and not applies("Pyraminx Duo")
+    assert applies("Ivy Cube") and applies("3x3x2 Cuboid") and applies("Pentagonal")
+
+
+def test_release_only_touches_the_packet(tmp_path):
+    index = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite"))
+    scrambles = generate_batch("Ivy Cube", 3, seed=17)
+    index.claim("Ivy Cube", scrambles[:1], ["Pink_Comp/r1/1"])
+    started = time.time()
+    index.claim("Ivy Cube", scrambles[1:], ["Pink_Comp/r1/2", "PinkXComp/r1/1"])
+    assert index.release("Pink_Comp", started) == 1
+    assert index.claim("Ivy Cube", scrambles, ["x/1", "x/2", "x/3"]) == [False, True, False]
@@ -0,0 +1,96 @@
+import base64
+import os
+import re
+import sys
+import threading
+import zlib
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from scrambler import export
+from scrambler.dedup import DuplicateIndex
+from scrambler.seeding import seeded_round
+
+
+def read(path):
+    with open(path, "rb") as f: return f.read()
+
+
+@pytest.mark.parametrize("mode", ["Pentagonal", "Ivy Cube", "3x3x2 Cuboid"])
+def test_seeded_export_is_the_same_for_any_worker_count(tmp_path, mode):
+    paths = [os.path.join(tmp_path, f"{workers}.pdf") for workers in (1, 2)]
+    for path, workers in zip(paths, (1, 2)):
+        export.export_pdf(path, "Comp", "2026-10-18", mode, 2, workers=workers, seed=11)
+    assert read(paths[0]) == read(paths[1])
+
+
+def test_seeded_rows_are_never_redrawn(tmp_path):
+    dedup = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite"))
+    rows = [(scr, None) for scr in seeded_round(14, "Ivy Cube", 1, 5)]
+    assert export.unique_rows(dedup, "Ivy Cube", 1, rows, "first", seed=14) == rows
+    assert export.unique_rows(dedup, "Ivy Cube", 1, rows, "second", seed=14) == rows
+
+
+def test_unseeded_clashes_are_redrawn(tmp_path):
+    dedup = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite"))
+    rows = export.render_round("Ivy Cube", 1, seeded_round(15, "Ivy Cube", 1, 3))
+    assert export.unique_rows(dedup, "Ivy Cube", 1, rows, "first") == rows
+    redrawn = export.unique_rows(dedup, "Ivy Cube", 1, rows, "second")
+    assert not {scr for scr, _ in redrawn} & {scr for scr, _ in rows}
+
+
+def test_abandoned_export_releases_its_claims(tmp_path):
+    dedup, cancel = DuplicateIndex(os.path.join(tmp_path, "issued.sqlite")), threading.Event()
+    path = os.path.join(tmp_path, "packet.pdf")
+    kept = seeded_round(16, "Ivy Cube", 1, 3)
+    dedup.claim("Ivy Cube", kept, [f"other.pdf/r1/{i}" for i in range(1, 4)])
+    with pytest.raises(export.ExportCancelled):
+        export.export_pdf(path, "Comp", "2026-10-18", "Ivy Cube", 3, workers=1, dedup=dedup, cancel=cancel,
+                          progress=lambda done, total: cancel.set())
+    assert len(dedup) == 3 and not os.path.exists(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_leaves_no_file(tmp_path, workers):
+    path, cancel = os.path.join(tmp_path, "packet.pdf"), threading.Event()
+    with pytest.raises(export.ExportCancelled):
+        export.export_pdf(path, "Comp", "2026-10-18", "Pentagonal", 4, workers=workers, cancel=cancel,
+                          progress=lambda done, total: cancel.set())
+    assert os.listdir(tmp_path) == []
+
+
+def test_streamed_packet_matches_one_shot_build(tmp_path, monkeypatch):
+    streamed, whole = os.path.join(tmp_path, "streamed.pdf"), os.path.join(tmp_path, "whole.pdf")
+    export.export_pdf(streamed, "Comp", "2026-10-18", "Pentagonal", 3, workers=1, seed=18)
+    # Lay every round out before platypus starts, as the packet was built before streaming.
+    monkeypatch.setattr(export, "FlowableStream", lambda chunks: [f for chunk in chunks for f in chunk])
+    export.export_pdf(whole, "Comp", "2026-10-18", "Pentagonal", 3, workers=1, seed=18)
+    assert read(streamed) == read(whole)
+
+
+def content(pdf):
+    """Every stream of a reportlab PDF (ASCII85 over Flate), decoded and joined."""
+    return b"".join(zlib.decompress(base64.a85decode(s.strip()[:-2])) for s in re.findall(rb"stream\r?\n(.*?)endstream", pdf, re.S))
+
+
+@pytest.mark.parametrize("mode, layers", [("Pentagonal", 2), ("Triangular", 2), ("Ivy Cube", 0)])
+def test_artwork_forms_are_drawn_once_and_reused(tmp_path, mode, layers):
+    path = os.path.join(tmp_path, "packet.pdf")
+    export.export_pdf(path, "Comp", "2026-10-18", mode, 2, workers=1, seed=20)
+    pdf = read(path)
+    names = [name for name, _ in filter(None, export.artwork(mode))]
+    assert len(names) == layers and pdf.count(b"/Subtype /Form") == layers
+    uses = re.findall(rb"/FormXob\.(\w+) Do", content(pdf))
+    assert sorted(set(uses)) == sorted(name.encode() for name in names)
+    assert len(uses) == 2 * (export.SCRAMBLES + export.EXTRAS) * layers
+
+
+def test_diagrams_are_vector_paths_without_a_display(tmp_path):
+    path = os.path.join(tmp_path, "packet.pdf")
+    export.export_pdf(path, "Comp", "2026-10-18", "3x3x2 Cuboid", 1, workers=1, seed=21)
+    pdf = read(path)
+    assert b"/Subtype /Image" not in pdf
+    assert len(re.findall(rb" re\b| m\b", content(pdf))) > export.SCRAMBLES + export.EXTRAS
+    assert "tkinter" not in sys.modules and "PIL.ImageGrab" not in sys.modules
@@ -0,0 +1,68 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from scrambler.engine import FACES
+from scrambler.generate import RANDOM_STATE_MIN_DISTANCE, SPECS, generate_batch, move_automaton, move_spec, sample_moves
+from scrambler.modes import MODES
+from scrambler.state import PuzzleState
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_generate_batch(mode):
+    scrambles = generate_batch(mode, 50, seed=6)
+    assert len(scrambles) == 50 and scrambles == generate_batch(mode, 50, seed=np.random.SeedSequence(6))
+    assert not any(PuzzleState.from_scramble(mode, scr).is_solved() for scr in scrambles)
+    assert generate_batch(mode, 50, seed=7) != scrambles
+
+
+RANDOM_MOVE_MODES = [m for m in SPECS if m not in RANDOM_STATE_MIN_DISTANCE]
+
+
+def legal(mode, faces):
+    """The adjacency rules, stated directly: no face twice in a row, and no X Y X with Y opposite X where banned."""
+    banned = "URFDLB" if mode == "3x3x2 Cuboid" else "UD"
+    for i in range(1, len(faces)):
+        if faces[i] == faces[i-1]: return False
+        if i >= 2 and faces[i] == faces[i-2] and FACES.index(faces[i-1]) == (FACES.index(faces[i]) + 3) % 6 and faces[i] in banned:
+            return False
+    return True
+
+
+@pytest.mark.parametrize("mode", RANDOM_MOVE_MODES)
+def test_sampled_moves_are_legal(mode):
+    moves, (lo, hi) = move_spec(mode)
+    seqs = sample_moves(mode, 5000, np.random.default_rng(3))
+    lengths = (seqs >= 0).sum(axis=1)
+    assert lengths.min() >= lo and lengths.max() <= hi
+    assert ((seqs >= 0) == (np.arange(hi) < lengths[:, None])).all()
+    for row in seqs.tolist():
+        assert legal(mode, [moves[i][0] for i in row if i >= 0]), row
+
+
+def test_sampled_moves_are_uniform():
+    mode, length, n = "2x2x3 Cuboid", 3, 200_000
+    moves = move_spec(mode)[0]
+    sequences = [s for s in itertools.product(range(len(moves)), repeat=length) if legal(mode, [moves[i][0] for i in s])]
+    seqs = sample_moves(mode, n, np.random.default_rng(4), lengths=(length, length))
+    codes = {s: i for i, s in enumerate(sequences)}
+    counts = np.bincount([codes[tuple(row)] for row in seqs.tolist()], minlength=len(sequences))
+    expected = n / len(sequences)
+    chi2, dof = ((counts - expected) ** 2 / expected).sum(), len(sequences) - 1
+    assert chi2 < dof + 6 * np.sqrt(2 * dof)
+
+
+def test_automaton_counts_match_enumeration():
+    mode = "3x3x2 Cuboid"
+    moves = move_spec(mode)[0]
+    step, probs = move_automaton(mode, 4)
+    # Every legal 4-move sequence from the start state has the same probability.
+    seen = []
+    for s in itertools.product(range(len(moves)), repeat=4):
+        p, state = 1.0, 0
+        for r, m in zip(range(4, 0, -1), s):
+            p, state = p * probs[r, state, m], step[state, m]
+        assert (p > 0) == legal(mode, [moves[i][0] for i in s])
+        if p: seen.append(p)
+    assert np.allclose(seen, 1 / len(seen))
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from scrambler.engine import FACES, SUFFIXES, get_engine
+from scrambler.modes import MODES, is_clock
+from scrambler.notation import clock_coefficients, compiled, simplify, tokenize
+
+STICKER_MODES = [m for m in MODES if not is_clock(m)]
+
+
+@pytest.mark.parametrize("mode", STICKER_MODES)
+def test_compiled_matches_token_composition(mode):
+    engine, rng = get_engine(mode), np.random.default_rng(2)
+    tokens = [f + s for f in FACES for s in SUFFIXES if engine.orders[f] > 1]
+    for _ in range(50):
+        scramble = " ".join(rng.choice(tokens, size=12))
+        perm = engine.compile(scramble.split())
+        assert (compiled(mode, scramble) == perm).all()
+        short = simplify(mode, scramble)
+        assert (engine.compile(short.split()) == perm).all()
+        assert len(tokenize(mode, short)) <= len(tokenize(mode, scramble))
+
+
+def test_simplify_merges_through_parallel_layers():
+    assert simplify("2x2x3 Cuboid", "U D U'") == "D"
+    assert simplify("2x2x3 Cuboid", "U U' R2") == "R2"
+    assert simplify("Ivy Cube", "R R R") == ""
+
+
+def test_malformed_token_raises():
+    with pytest.raises(ValueError, match="'X'"):
+        tokenize("2x2x3 Cuboid", "U X R2")
+    with pytest.raises(ValueError, match="'UR13'"):
+        clock_coefficients("Pentagonal", "UR1+ UR13 y2 DL2-")
+
+
+@pytest.mark.parametrize("mode, scramble, token", [("Ivy Cube", "R U", "'U'"), ("Pyraminx Duo", "F D", "'F'"),
+                                                   ("1x2x3 Cuboid", "R2 L2", "'L2'"), ("3x3x1 Cuboid", "R U", "'U'")])
+def test_faces_the_puzzle_lacks_are_malformed(mode, scramble, token):
+    with pytest.raises(ValueError, match=token):
+        tokenize(mode, scramble)
@@ -0,0 +1,11 @@
+import os
+
+from scrambler.pool import ScramblePool
+
+
+def test_take_issues_each_scramble_once(tmp_path):
+    pool = ScramblePool(os.path.join(tmp_path, "pool.sqlite"), target=10)
+    assert pool.refill("3x3x2 Cuboid") == 10 and pool.available("3x3x2 Cuboid") == 10
+    first, second = pool.take("3x3x2 Cuboid", 6), pool.take("3x3x2 Cuboid", 6)
+    assert len(first) == len(second) == 6 and not set(first) & set(second)
+    assert pool.available("3x3x2 Cuboid") == 0
@@ -0,0 +1,8 @@
+from scrambler.seeding import seeded_round, seeded_scramble
+
+
+def test_seeded_scrambles_stand_alone():
+    rows = seeded_round(12, "Ivy Cube", 2, 7)
+    assert rows[4] == seeded_scramble(12, "Ivy Cube", 2, 5)
+    assert rows != seeded_round(12, "Ivy Cube", 3, 7) and rows != seeded_round(13, "Ivy Cube", 2, 7)
+    assert seeded_round(12, "Pentagonal", 2, 7) != seeded_round(12, "Triangular", 2, 7)
@@ -0,0 +1,73 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+from http import HTTPStatus
+from urllib.parse import quote
+
+import pytest
+
+from scrambler.seeding import seeded_round
+from scrambler.server import HttpError, ScrambleServer
+
+
+def get(target):
+    return asyncio.run(ScrambleServer().respond("GET", target))
+
+
+def test_seeded_round():
+    _, body, cacheable = get("/scramble?mode=ivy%20cube&seed=4&round=2&n=3")
+    assert json.loads(body) == {"mode": "Ivy Cube", "scrambles": seeded_round(4, "Ivy Cube", 2, 3)} and cacheable
+    _, body, _ = get("/scramble?mode=Ivy%20Cube&seed=4&round=2&index=2")
+    assert json.loads(body)["scrambles"] == seeded_round(4, "Ivy Cube", 2, 3)[1:2]
+
+
+@pytest.mark.parametrize("query", ["seed=-1&round=1", "seed=4&round=0", "seed=4&round=1&index=0", "seed=x&round=1", "n=0"])
+def test_bad_parameters_are_client_errors(query):
+    with pytest.raises(HttpError) as error:
+        get(f"/scramble?mode=Pentagonal&{query}")
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_diagram():
+    scramble = seeded_round(4, "Pentagonal", 1, 1)[0]
+    content_type, body, _ = get(f"/diagram.svg?mode=Pentagonal&scramble={quote(scramble)}")
+    assert content_type == "image/svg+xml" and body.startswith(b"<svg")
+
+
+@pytest.fixture(scope="module")
+def port():
+    """A server on an ephemeral port, on its own loop in a daemon thread."""
+    ready = threading.Event()
+    def started(srv):
+        ready.port = srv.sockets[0].getsockname()[1]; ready.set()
+    threading.Thread(target=asyncio.run, args=(ScrambleServer().serve("127.0.0.1", 0, started),), daemon=True).start()
+    assert ready.wait(10)
+    return ready.port
+
+
+def test_keep_alive_over_a_socket(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/modes")
+    response = conn.getresponse()
+    assert response.status == 200 and response.getheader("Connection") == "keep-alive" and "Ivy Cube" in json.loads(response.read())
+    sock = conn.sock
+    conn.request("GET", "/scramble?mode=Pentagonal&seed=4&round=0")
+    response = conn.getresponse()
+    assert response.status == 400 and b"round" in response.read()
+    conn.request("HEAD", "/scramble?mode=Ivy%20Cube&seed=4&round=1&n=2")
+    response = conn.getresponse()
+    assert response.status == 200 and int(response.getheader("Content-Length")) > 0 and response.read() == b""
+    assert conn.sock is sock
+    conn.request("GET", "/modes", headers={"Connection": "close"})
+    assert conn.getresponse().read() and conn.sock is None
+    conn.close()
+
+
+def test_large_body_is_refused(port):
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+        sock.sendall(b"GET /modes HTTP/1.1\r\nHost: x\r\nContent-Length: 1000000000\r\n\r\n")
+        reply = b""
+        while chunk := sock.recv(4096): reply += chunk
+    assert reply.startswith(b"HTTP/1.1 413 ") and b"Connection: close" in reply
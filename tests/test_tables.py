@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from scrambler.engine import get_engine
+from scrambler.generate import RANDOM_STATE_MIN_DISTANCE, distance_table, generate_batch, move_spec
+from scrambler.tables import get_table
+
+
+@pytest.mark.parametrize("mode, size", [("1x2x3 Cuboid", 48), ("3x3x1 Cuboid", 192), ("Pyraminx Duo", 324),
+                                        ("Ivy Cube", 29160), ("2x2x3 Cuboid", 241920)])
+def test_table_sizes(mode, size):
+    table = get_table(mode, tuple(move_spec(mode)[0]))
+    assert len(table) == size
+    assert table.distance(get_engine(mode).solved[None])[0] == 0
+
+
+def test_table_rejects_identity_moves():
+    with pytest.raises(ValueError, match="does nothing"):
+        get_table("Ivy Cube", ("R", "U"))
+
+
+@pytest.mark.parametrize("mode", list(RANDOM_STATE_MIN_DISTANCE))
+def test_random_state_scrambles_are_optimal(mode):
+    table, engine = distance_table(mode), get_engine(mode)
+    scrambles = generate_batch(mode, 200, seed=5)
+    dist = table.distance(np.stack([engine.apply(s) for s in scrambles]))
+    assert dist.min() >= RANDOM_STATE_MIN_DISTANCE[mode]
+    assert [len(s.split()) for s in scrambles] == dist.tolist()
@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+
+from scrambler import trace
+from scrambler.__main__ import main
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    """Tracing on for one test, and off again (with nothing recorded) after it."""
+    monkeypatch.setattr(trace, "ENABLED", False)
+    monkeypatch.setattr(trace, "PATH", None)
+    yield
+    trace.reset()
+
+
+def load(path):
+    with open(path) as f: return json.load(f)["traceEvents"]
+
+
+def test_cli_writes_trace_and_summary(tmp_path, tracing, capsys):
+    path = os.path.join(tmp_path, "trace.json")
+    assert main(["Pentagonal", "-n", "3", "--trace", path]) == 0
+    err = capsys.readouterr().err
+    assert "stage" in err and f"trace written to {path}" in err
+    events = load(path)
+    assert any(ev["name"] == "generate" and ev["ph"] == "X" for ev in events)
+
+
+def test_export_trace_covers_the_workers(tmp_path, tracing, capsys):
+    pytest.importorskip("reportlab")
+    from scrambler import export
+    trace.enable()
+    path = os.path.join(tmp_path, "packet.pdf")
+    export.export_pdf(path, "Comp", "2026-10-18", "Ivy Cube", 2, workers=2, seed=19)
+    events = load(f"{path}.trace.json")
+    renders = {ev["pid"] for ev in events if ev["name"] == "render"}
+    assert renders and os.getpid() not in renders
+    assert {"build", "layout"} <= {ev["name"] for ev in events}
+    assert "trace written to" in capsys.readouterr().err